@@ -0,0 +1,68 @@
+"""
+Benchmark: cost of `import z_lib` and `Z_Lib()` in a fresh interpreter.
+
+Each run starts a new Python process, so the numbers include module loading the
+way a short-lived worker sees it. Exits with status 1 if the median exceeds --budget-ms.
+
+    python benchmarks/bench_startup.py --runs 20 --budget-ms 50
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+SRC = Path(__file__).resolve().parent.parent / "src"
+
+_PROBE = """
+import json, sys, time
+baseline = set(sys.modules)
+t0 = time.perf_counter()
+import z_lib
+t1 = time.perf_counter()
+z = z_lib.Z_Lib()
+t2 = time.perf_counter()
+z.resolve("some/local/file.txt")
+t3 = time.perf_counter()
+print(json.dumps({
+    "import": t1 - t0,
+    "init": t2 - t1,
+    "resolve": t3 - t2,
+    "modules": sorted(set(sys.modules) - baseline),
+}))
+"""
+
+
+def run_once() -> dict:
+    env = dict(os.environ, PYTHONPATH=str(SRC) + os.pathsep + os.environ.get("PYTHONPATH", ""))
+    out = subprocess.run([sys.executable, "-c", _PROBE], env=env, capture_output=True, text=True, check=True)
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--budget-ms", type=float, default=None, help="fail if median import+init exceeds this")
+    parser.add_argument("--modules", action="store_true", help="list modules loaded by import + init")
+    args = parser.parse_args()
+
+    results = [run_once() for _ in range(args.runs)]
+    for key in ("import", "init", "resolve"):
+        values = [r[key] * 1000 for r in results]
+        print(f"{key:<8} median {statistics.median(values):7.2f} ms   min {min(values):7.2f} ms")
+
+    total = statistics.median((r["import"] + r["init"]) * 1000 for r in results)
+    modules = results[-1]["modules"]
+    print(f"import+init median {total:.2f} ms   {len(modules)} new module(s)")
+    if args.modules:
+        print("\n".join(f"  {name}" for name in modules))
+
+    if args.budget_ms is not None and total > args.budget_ms:
+        print(f"over budget: {total:.2f} ms > {args.budget_ms} ms")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
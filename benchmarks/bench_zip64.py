@@ -0,0 +1,82 @@
+"""
+Benchmark: mount, read and save a ZIP with one very large (Zip64) member.
+
+Peak RSS is reported after each phase; it should stay flat (around the chunk size
+plus interpreter overhead) no matter how large the member is.
+
+    python benchmarks/bench_zip64.py                  # 10 GiB member
+    python benchmarks/bench_zip64.py --size-gib 1 --chunk-size 4194304
+
+Needs roughly three times the member size of free disk space in --workdir
+(source archive, extracted temp dir, saved archive).
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+import zipfile
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+from z_lib import Z_Lib  # noqa: E402
+
+_BLOCK = os.urandom(1024 * 1024)
+
+
+def peak_rss_mib() -> float:
+    try:
+        import resource
+    except ImportError:  # Windows
+        return float("nan")
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux は KiB、macOS はバイト単位
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def build_archive(path: Path, size: int, compression: int) -> None:
+    with zipfile.ZipFile(path, "w", compression=compression) as zf:
+        with zf.open("huge.bin", "w", force_zip64=True) as dst:
+            remaining = size
+            while remaining:
+                block = _BLOCK[:remaining]
+                dst.write(block)
+                remaining -= len(block)
+
+
+def phase(name: str, fn) -> None:
+    start = time.perf_counter()
+    fn()
+    print(f"{name:<8} {time.perf_counter() - start:8.1f}s   peak RSS {peak_rss_mib():8.1f} MiB")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--size-gib", type=float, default=10.0)
+    parser.add_argument("--chunk-size", type=int, default=None)
+    parser.add_argument("--stored", action="store_true", help="use ZIP_STORED instead of ZIP_DEFLATED")
+    parser.add_argument("--workdir", default=None)
+    args = parser.parse_args()
+
+    size = int(args.size_gib * 1024 ** 3)
+    compression = zipfile.ZIP_STORED if args.stored else zipfile.ZIP_DEFLATED
+    with tempfile.TemporaryDirectory(dir=args.workdir) as work:
+        archive = Path(work) / "huge.zip"
+        z = Z_Lib(chunk_size=args.chunk_size)
+
+        def read_all():
+            with z.open(f"{archive}/huge.bin", "rb") as f:
+                while f.read(args.chunk_size or 1024 * 1024):
+                    pass
+
+        print(f"member size {size / 1024 ** 3:.1f} GiB   chunk size {args.chunk_size or 'default'}")
+        phase("build", lambda: build_archive(archive, size, compression))
+        phase("mount", lambda: z.load_zip(str(archive)))
+        phase("read", read_all)
+        phase("save", lambda: z.unload_zip(str(archive)))
+        phase("verify", lambda: z.verify(str(archive)))
+
+
+if __name__ == "__main__":
+    main()
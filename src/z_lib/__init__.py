@@ -1,12 +1,45 @@
-from .exceptions import ZipNotLoadedError, ZipAlreadyLoadedError, ZipPathError
-from ._types import ZipHandle, OpenMode
-from .core import Z_Lib
+from typing import TYPE_CHECKING
+from .exceptions import ZipNotLoadedError, ZipAlreadyLoadedError, ZipPathError, ZipIntegrityError
+from ._types import ZipHandle, OpenMode, VerifyReport
+
+if TYPE_CHECKING:
+    from .core import Z_Lib
+    from .prefetch import Prefetcher
+    from .mount import ZipMount
+    from .backend.registry import register_backend
+
+# 重いモジュール (core, zipfile, スレッドプール) は属性に初めてアクセスした時点で import する
+_LAZY = {
+    "Z_Lib": ".core",
+    "Prefetcher": ".prefetch",
+    "ZipMount": ".mount",
+    "register_backend": ".backend.registry",
+}
 
 __all__ = [
     "Z_Lib",
     "ZipNotLoadedError",
     "ZipAlreadyLoadedError",
     "ZipPathError",
+    "ZipIntegrityError",
     "ZipHandle",
     "OpenMode",
+    "VerifyReport",
+    "Prefetcher",
+    "ZipMount",
+    "register_backend",
 ]
+
+
+def __getattr__(name: str):
+    module = _LAZY.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    from importlib import import_module
+    value = getattr(import_module(module, __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
@@ -1,10 +1,51 @@
-from typing import TypedDict, Literal, IO
+from typing import TypedDict, Literal, IO, Optional, NotRequired, Dict, List, TYPE_CHECKING
 from pathlib import Path
 
+if TYPE_CHECKING:
+    from .backend.zip_index import ZipIndex
+    from .backend.memory_backend import MemoryTree
+    from .journal import ChangeJournal
+
 OpenMode = Literal["r", "rw"]
+ChangeKind = Literal["created", "modified", "deleted", "moved"]
+ChangeSource = Literal["api", "scan"]
 
 class ZipHandle(TypedDict):
     path: str              # Original ZIP file path
     temp_dir: str          # Path to the temporary directory where ZIP is extracted
     mode: OpenMode         # "r" or "rw"
+    index: NotRequired[Optional["ZipIndex"]]  # Central-directory index of the original ZIP (None if newly created)
+    encoding: NotRequired[Optional[str]]      # Code page for non-UTF-8 entry names, reused on save
+    backend: NotRequired[str]                 # Registry name of the backend that mounted it ("zipfile", "memory", ...)
+    tree: NotRequired[Optional["MemoryTree"]] # In-memory members (memory backend, until materialized to disk)
+    journal: NotRequired["ChangeJournal"]     # Changes made inside the mount (set by Z_Lib.load_zip)
+    dedup: NotRequired[bool]                  # Compress identical payloads only once when saving
+    save_stats: NotRequired[Optional["SaveStats"]]  # Statistics of the last save/export
+
+class SaveStats(TypedDict):
+    files: int                 # Members written
+    unique: int                # Members compressed
+    duplicates: int            # Members written by copying already-compressed bytes
+    reused: int                # Unchanged (possibly renamed) members copied from the original archive
+    reused_bytes: int          # Compressed bytes copied for them
+    total_bytes: int           # Uncompressed size of all members
+    deduplicated_bytes: int    # Uncompressed size of the duplicates (not compressed again)
+    dedup_ratio: float         # Bytes that needed compressing without dedup / bytes actually compressed
+    hash_seconds: float        # Time spent hashing candidates (same-size files only)
+    compress_seconds: float    # Time spent compressing unique payloads
+    cpu_saved_seconds: float   # Estimated compression time avoided for the duplicates
+
+class VerifyReport(TypedDict):
+    path: str              # Verified ZIP file path
+    checked: int           # Number of members checked (directories included)
+    bad: Dict[str, str]    # Member name -> description of the problem
+    skipped: List[str]     # Encrypted members that cannot be checked without a password
 
+class ChangeEvent(TypedDict):
+    seq: int                     # 1-based position in the mount's journal
+    kind: ChangeKind             # "created", "modified", "deleted" or "moved"
+    path: str                    # Virtual path (source path for "moved")
+    dest: Optional[str]          # Virtual destination path for "moved", else None
+    source: ChangeSource         # "api" (recorded by Z_Lib) or "scan" (found by reconcile)
+    internal: str                # `path` relative to the archive root
+    internal_dest: Optional[str] # `dest` relative to the archive root
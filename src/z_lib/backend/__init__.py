@@ -1,4 +1,37 @@
-from .protocol import ZipBackend
-from .zipfile_backend import ZipFileBackend
+from typing import TYPE_CHECKING
 
-__all__ = ["ZipBackend", "ZipFileBackend"]
+if TYPE_CHECKING:
+    from .protocol import ZipBackend
+    from .zipfile_backend import ZipFileBackend
+    from .memory_backend import MemoryBackend
+    from .registry import register_backend, create_backend, backend_names
+    from .zip_index import ZipIndex, load_index, prune_cache
+
+# サブモジュールは初回アクセス時に import する (z_lib.core から protocol だけを参照しても zipfile を読み込まない)
+_LAZY = {
+    "ZipBackend": ".protocol",
+    "ZipFileBackend": ".zipfile_backend",
+    "MemoryBackend": ".memory_backend",
+    "register_backend": ".registry",
+    "create_backend": ".registry",
+    "backend_names": ".registry",
+    "ZipIndex": ".zip_index",
+    "load_index": ".zip_index",
+    "prune_cache": ".zip_index",
+}
+
+__all__ = list(_LAZY)
+
+
+def __getattr__(name: str):
+    module = _LAZY.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    from importlib import import_module
+    value = getattr(import_module(module, __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
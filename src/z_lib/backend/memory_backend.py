@@ -0,0 +1,236 @@
+import errno
+import io
+import os
+import stat
+import time
+import zipfile
+from functools import partial
+from pathlib import Path
+from typing import Dict, IO, Iterator, List, Optional, Tuple
+from .._types import ZipHandle, OpenMode
+from ..reaper import get_reaper
+from .zipfile_backend import ZipFileBackend, _make_zipinfo, _write_payloads, _dedup_enabled
+
+
+class MemoryTree:
+    """
+    Members of a mount held as bytes in RAM.
+
+    Exposes the lookup API of ZipIndex that the namespaces use for metadata
+    (`find`, `children`, `child_is_dir`, `stat`), kept up to date as files are written,
+    so listing, stat and glob are answered from dicts for rw mounts as well.
+    """
+
+    def __init__(self, mtime: float) -> None:
+        self._ids: Dict[str, int] = {}
+        self._names: List[str] = []
+        self._data: List[bytes] = []
+        self._mtimes: List[float] = []
+        # ディレクトリ -> {子の名前: 位置}。ディレクトリの位置は -1 (ZipIndex と同じ規約)
+        self._dirs: Dict[str, Dict[str, int]] = {"": {}}
+        self._dir_mtime = mtime
+        self.dirty = False
+
+    @property
+    def nbytes(self) -> int:
+        return sum(len(data) for data in self._data)
+
+    def find(self, name: str) -> int:
+        return self._ids.get(name.strip("/"), -1)
+
+    def children(self, internal: str) -> Optional[Dict[str, int]]:
+        return self._dirs.get(internal.strip("/"))
+
+    def child_is_dir(self, pos: int) -> bool:
+        return pos < 0
+
+    def stat(self, pos: int) -> os.stat_result:
+        if pos < 0:
+            mtime = self._dir_mtime
+            return os.stat_result((stat.S_IFDIR | 0o755, 0, 0, 1, 0, 0, 0, mtime, mtime, mtime))
+        mtime = self._mtimes[pos]
+        return os.stat_result((stat.S_IFREG | 0o644, 0, 0, 1, 0, 0, len(self._data[pos]), mtime, mtime, mtime))
+
+    def read(self, internal: str) -> bytes:
+        pos = self.find(internal)
+        if pos < 0:
+            code = errno.EISDIR if self.children(internal) is not None else errno.ENOENT
+            raise OSError(code, os.strerror(code), internal)
+        return self._data[pos]
+
+    def files(self) -> Iterator[Tuple[str, bytes, float]]:
+        """Yield (name, content, mtime) for every file, in insertion order."""
+        for name, pos in self._ids.items():
+            yield name, self._data[pos], self._mtimes[pos]
+
+    def dirs(self) -> Iterator[str]:
+        return (name for name in self._dirs if name)
+
+    def add_dir(self, internal: str) -> None:
+        internal = internal.strip("/")
+        if not internal or internal in self._dirs:
+            return
+        parent, _, leaf = internal.rpartition("/")
+        self.add_dir(parent)
+        self._dirs[internal] = {}
+        self._dirs[parent][leaf] = -1
+
+    def write(self, internal: str, data: bytes, mtime: Optional[float] = None, dirty: bool = True) -> None:
+        internal = internal.strip("/")
+        mtime = time.time() if mtime is None else mtime
+        pos = self._ids.get(internal)
+        if pos is None:
+            parent, _, leaf = internal.rpartition("/")
+            self.add_dir(parent)
+            pos = self._ids[internal] = len(self._names)
+            self._names.append(internal)
+            self._data.append(data)
+            self._mtimes.append(mtime)
+            self._dirs[parent][leaf] = pos
+        else:
+            self._data[pos] = data
+            self._mtimes[pos] = mtime
+        self.dirty = self.dirty or dirty
+
+    def open(
+        self,
+        internal: str,
+        mode: str = "r",
+        path: Optional[str] = None,
+        encoding: Optional[str] = None,
+        errors: Optional[str] = None,
+        newline: Optional[str] = None,
+        **_kwargs,
+    ) -> IO:
+        """
+        open() 相当。"r" / "w" / "x" / "a" (テキスト・バイナリ) に対応する。
+        書き込みはクローズ時にまとめて反映する。"+" を含むモードは扱わない。
+        """
+        internal = internal.strip("/")
+        display = path or internal
+        kind = mode.replace("b", "").replace("t", "")
+        pos = self.find(internal)
+        if self.children(internal) is not None:
+            raise IsADirectoryError(errno.EISDIR, os.strerror(errno.EISDIR), display)
+
+        if kind == "r":
+            if pos < 0:
+                raise FileNotFoundError(errno.ENOENT, os.strerror(errno.ENOENT), display)
+            buf: io.BytesIO = io.BytesIO(self._data[pos])
+        elif kind in ("w", "x", "a"):
+            if internal.rpartition("/")[0] not in self._dirs:
+                raise FileNotFoundError(errno.ENOENT, os.strerror(errno.ENOENT), display)
+            if kind == "x" and pos >= 0:
+                raise FileExistsError(errno.EEXIST, os.strerror(errno.EEXIST), display)
+            buf = _MemoryFile(self, internal)
+            if kind == "a" and pos >= 0:
+                buf.write(self._data[pos])
+        else:
+            raise ValueError(f"Unsupported mode for an in-memory file: {mode!r}")
+
+        if "b" in mode:
+            return buf
+        return io.TextIOWrapper(buf, encoding=encoding, errors=errors, newline=newline)
+
+
+class _MemoryFile(io.BytesIO):
+    """書き込み用バッファ。クローズ時に内容を MemoryTree へ反映する。"""
+
+    def __init__(self, tree: MemoryTree, internal: str) -> None:
+        super().__init__()
+        self._tree = tree
+        self._internal = internal
+
+    def close(self) -> None:
+        if not self.closed:
+            self._tree.write(self._internal, self.getvalue())
+        super().close()
+
+
+def memory_tree(handle: ZipHandle) -> Optional[MemoryTree]:
+    """Return the in-memory members of a mount, or None if it lives on disk."""
+    return handle.get("tree")
+
+
+class MemoryBackend(ZipFileBackend):
+    """
+    Backend that keeps every member as bytes in RAM instead of extracting to a temp dir.
+
+    Meant for small archives, where mkdtemp + extraction + rmtree costs more than the data.
+    When a real filesystem path is needed (resolve(), os-level operations), the mount is
+    materialized into a temp dir once and from then on behaves like ZipFileBackend.
+    """
+
+    def open(self, path: str, create: bool, mode: OpenMode = "rw", encoding: Optional[str] = None) -> ZipHandle:
+        path_obj = Path(path).resolve()
+        index = self._load_index(path_obj, path, create, encoding)
+
+        tree = MemoryTree(path_obj.stat().st_mtime if index is not None else time.time())
+        if index is not None:
+            with open(path_obj, "rb") as fp:
+                for i in index.offset_order():
+                    name = index.names[i]
+                    if name.endswith("/"):
+                        tree.add_dir(name)
+                        continue
+                    with index.open_member(fp, i) as src:
+                        tree.write(name, src.read(), index.mtime(i), dirty=False)
+
+        return ZipHandle(
+            path=str(path_obj),
+            temp_dir="",
+            mode=mode,
+            index=index,
+            encoding=index.encoding if index is not None else encoding,
+            backend="memory",
+            tree=tree,
+        )
+
+    def materialize(self, handle: ZipHandle) -> str:
+        tree = memory_tree(handle)
+        if tree is None:
+            return handle["temp_dir"]
+
+        temp_dir = get_reaper().make_temp_dir()
+        root = Path(temp_dir)
+        for name in tree.dirs():
+            (root / name).mkdir(parents=True, exist_ok=True)
+        for name, data, mtime in tree.files():
+            dest = root / name
+            dest.write_bytes(data)
+            os.utime(dest, (mtime, mtime))
+
+        # 以降は一時ディレクトリが正となり、ZipFileBackend と同じ経路で保存・削除される
+        handle["temp_dir"] = temp_dir
+        handle["tree"] = None
+        return temp_dir
+
+    def read(self, handle: ZipHandle, internal_path: str) -> bytes:
+        tree = memory_tree(handle)
+        if tree is None:
+            return super().read(handle, internal_path)
+        return tree.read(internal_path)
+
+    def close(self, handle: ZipHandle, save: bool) -> None:
+        tree = memory_tree(handle)
+        if tree is None:
+            super().close(handle, save)
+            return
+        try:
+            # 未変更の既存ZIPは書き直さない
+            if save and handle["mode"] == "rw" and (tree.dirty or handle.get("index") is None):
+                self._write_to_path(handle, Path(handle["path"]), self._compression, self._compresslevel)
+        finally:
+            handle["tree"] = None
+
+    def _write_members(self, zf: zipfile.ZipFile, handle: ZipHandle) -> None:
+        tree = memory_tree(handle)
+        if tree is None:
+            super()._write_members(zf, handle)
+            return
+        encoding = handle.get("encoding")
+        payloads = [
+            (_make_zipinfo(zf, name, encoding, mtime=mtime), len(data), partial(io.BytesIO, data), None)
+            for name, data, mtime in tree.files()
+        ]
+        handle["save_stats"] = _write_payloads(zf, payloads, self._chunk_size, dedup=_dedup_enabled(zf, handle))
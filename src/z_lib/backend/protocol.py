@@ -1,9 +1,10 @@
-from typing import Protocol, runtime_checkable
+import os
+from typing import BinaryIO, Optional, Protocol, Union, runtime_checkable
 from .._types import ZipHandle, OpenMode
 
 @runtime_checkable
 class ZipBackend(Protocol):
-    def open(self, path: str, create: bool, mode: OpenMode) -> ZipHandle:
+    def open(self, path: str, create: bool, mode: OpenMode, encoding: Optional[str] = None) -> ZipHandle:
         """
         Open (mount) a ZIP file.
         
@@ -11,6 +12,8 @@ class ZipBackend(Protocol):
             path: Path to the ZIP file.
             create: If True, allow creating a new ZIP if it doesn't exist.
             mode: "r" (read-only) or "rw" (read-write).
+            encoding: Code page of entry names stored without the UTF-8 flag.
+                None to detect it from the archive.
             
         Returns:
             A ZipHandle dictionary containing the temp directory and metadata.
@@ -26,3 +29,40 @@ class ZipBackend(Protocol):
             save: If True and mode is "rw", save changes back to the original ZIP file.
         """
         ...
+
+    def materialize(self, handle: ZipHandle) -> str:
+        """
+        Make sure the mount's files exist on disk and return that directory.
+        Called before a virtual path is handed out as a real filesystem path.
+
+        Args:
+            handle: The ZipHandle of the mount.
+        """
+        ...
+
+    def read(self, handle: ZipHandle, internal_path: str) -> bytes:
+        """
+        Read the whole content of a member of a mounted ZIP file.
+
+        Args:
+            handle: The ZipHandle of the mount.
+            internal_path: Path of the member inside the ZIP.
+        """
+        ...
+
+    def export(
+        self,
+        handle: ZipHandle,
+        dest: Union[str, os.PathLike, BinaryIO],
+        compression: Optional[int] = None,
+        compresslevel: Optional[int] = None,
+    ) -> None:
+        """
+        Write a ZIP of the current mount state to a path or writable binary stream.
+
+        Args:
+            handle: The ZipHandle of the mount.
+            dest: Destination path or stream.
+            compression, compresslevel: Override the backend's save settings.
+        """
+        ...
@@ -0,0 +1,33 @@
+from typing import Callable, Dict, List
+from .protocol import ZipBackend
+from .zipfile_backend import ZipFileBackend
+from .memory_backend import MemoryBackend
+
+# バックエンド名 -> ファクトリ。ファクトリは Z_Lib のバックエンド設定 (chunk_size など) をキーワード引数で受け取る
+_FACTORIES: Dict[str, Callable[..., ZipBackend]] = {}
+
+
+def register_backend(name: str, factory: Callable[..., ZipBackend]) -> None:
+    """
+    Register a backend factory under `name`, so it can be chosen with
+    `Z_Lib(backend=name)` or `load_zip(..., backend=name)`.
+    The factory is called with the Z_Lib backend options as keyword arguments.
+    """
+    _FACTORIES[name] = factory
+
+
+def create_backend(name: str, **options) -> ZipBackend:
+    """Instantiate the backend registered as `name`."""
+    try:
+        factory = _FACTORIES[name]
+    except KeyError:
+        raise ValueError(f"Unknown backend {name!r} (available: {', '.join(backend_names())})") from None
+    return factory(**options)
+
+
+def backend_names() -> List[str]:
+    return sorted(_FACTORIES)
+
+
+register_backend("zipfile", ZipFileBackend)
+register_backend("memory", MemoryBackend)
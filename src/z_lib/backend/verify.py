@@ -0,0 +1,96 @@
+import zipfile
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple, Union
+from .._types import VerifyReport
+from .zip_index import ZipIndex
+
+_CHUNK_SIZE = 1024 * 1024
+_FLAG_ENCRYPTED = 0x1
+
+# 1 タスクで検証するメンバー群の目安。圧縮サイズで均等に分け、ワーカー間の偏りを抑える
+_TASKS_PER_WORKER = 4
+
+
+def verify_archive(
+    path: Union[str, Path],
+    workers: Optional[int] = None,
+    chunk_size: int = _CHUNK_SIZE,
+) -> VerifyReport:
+    """
+    Check the CRC32 and size of every member of a ZIP without extracting it.
+
+    The central directory is always parsed afresh (never from the index cache), so
+    corruption there is reported too. Members are decompressed in memory in chunks
+    of `chunk_size`; with `workers`, contiguous runs of members are checked in parallel,
+    each thread reading its own file handle in offset order.
+
+    Raises:
+        zipfile.BadZipFile: If the central directory itself cannot be read.
+    """
+    index = ZipIndex.build(path)
+    order = index.offset_order()
+    bad: Dict[str, str] = {}
+    skipped: List[str] = []
+
+    tasks = _partition(index, order, (workers or 1) * _TASKS_PER_WORKER)
+    if workers:
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="z_lib_verify") as executor:
+            results = list(executor.map(lambda run: _verify_run(path, index, run, chunk_size), tasks))
+    else:
+        results = [_verify_run(path, index, run, chunk_size) for run in tasks]
+
+    for run_bad, run_skipped in results:
+        bad.update(run_bad)
+        skipped.extend(run_skipped)
+    return VerifyReport(path=str(path), checked=len(order) - len(skipped), bad=bad, skipped=skipped)
+
+
+def _partition(index: ZipIndex, order: List[int], parts: int) -> List[List[int]]:
+    """Split members (in offset order) into contiguous runs of roughly equal compressed size."""
+    total = sum(index.compress_sizes[i] for i in order)
+    target = max(1, total // max(1, parts))
+    runs: List[List[int]] = [[]]
+    size = 0
+    for i in order:
+        if size >= target and runs[-1]:
+            runs.append([])
+            size = 0
+        runs[-1].append(i)
+        size += index.compress_sizes[i]
+    return [run for run in runs if run]
+
+
+def _verify_run(path: Union[str, Path], index: ZipIndex, run: List[int], chunk_size: int) -> Tuple[Dict[str, str], List[str]]:
+    bad: Dict[str, str] = {}
+    skipped: List[str] = []
+    with open(path, "rb") as fp:
+        for i in run:
+            name = index.names[i]
+            if index.is_dir(i):
+                continue
+            if index.flag_bits[i] & _FLAG_ENCRYPTED:
+                skipped.append(name)
+                continue
+            error = _verify_member(fp, index, i, chunk_size)
+            if error is not None:
+                bad[name] = error
+    return bad, skipped
+
+
+def _verify_member(fp, index: ZipIndex, i: int, chunk_size: int) -> Optional[str]:
+    size = 0
+    try:
+        with index.open_member(fp, i) as src:
+            # 末尾まで読むと ZipExtFile が CRC を照合し、不一致なら BadZipFile を送出する
+            while True:
+                chunk = src.read(chunk_size)
+                if not chunk:
+                    break
+                size += len(chunk)
+    except (zipfile.BadZipFile, EOFError, zlib.error, OSError, NotImplementedError, ValueError) as e:
+        return f"{type(e).__name__}: {e}"
+    if size != index.file_sizes[i]:
+        return f"size mismatch: expected {index.file_sizes[i]} bytes, got {size}"
+    return None
@@ -0,0 +1,658 @@
+import hashlib
+import json
+import os
+import re
+import stat
+import struct
+import sys
+import time
+import zipfile
+from array import array
+from pathlib import Path
+from typing import BinaryIO, Dict, List, Optional, Union, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from .._types import ZipHandle
+
+# ZIP の中央ディレクトリ (central directory) を zipfile.ZipInfo を作らずに直接読み、
+# オフセット・サイズ・CRC を array に、デコード済みのエントリ名を str のリストに保持する。
+# 数百万エントリのアーカイブでも 1 エントリあたりの常駐メモリを数十バイトに抑えられる。
+
+_FLAG_UTF8 = 0x800
+_FLAG_ENCRYPTED = 0x1
+
+_EOCD = struct.Struct("<4s4H2LH")
+_EOCD_SIGNATURE = b"PK\x05\x06"
+_EOCD64_LOCATOR = struct.Struct("<4sLQL")
+_EOCD64_LOCATOR_SIGNATURE = b"PK\x06\x07"
+_EOCD64 = struct.Struct("<4sQ2H2L4Q")
+_EOCD64_SIGNATURE = b"PK\x06\x06"
+_CENTRAL_DIR = struct.Struct("<4s4B4HL2L5H2L")
+_CENTRAL_DIR_SIGNATURE = b"PK\x01\x02"
+_LOCAL_HEADER = struct.Struct("<4s2B4HL2L2H")
+_LOCAL_HEADER_SIGNATURE = b"PK\x03\x04"
+_ZIP64_EXTRA_ID = 0x0001
+_MAX_COMMENT = 0xFFFF
+
+_CACHE_MAGIC = b"ZLIX"
+_CACHE_VERSION = 4
+_CACHE_HEADER = struct.Struct("<4sHI")
+
+# 共有キャッシュディレクトリは書き込みのたびに掃除する (ただし同じディレクトリは一定間隔ごと)。
+# 元のZIPが消えた・書き換えられたエントリを削除し、残りが上限を超えたら更新が古い順に削除する。
+CACHE_MAX_ENTRIES = 1024
+_PRUNE_INTERVAL = 60.0
+_STALE_TMP_AGE = 60 * 60
+# キャッシュディレクトリは利用者が指定した共有ディレクトリのこともあるため、自分の命名のファイルだけを対象にする
+_CACHE_FILE = re.compile(r"^[0-9a-f]{40}\.zidx$")
+_CACHE_TMP_FILE = re.compile(r"^[0-9a-f]{40}\.zidx\.\d+\.tmp$")
+_last_prune: Dict[str, float] = {}
+
+# 永続化する配列 (属性名, typecode) の並び。キャッシュファイル上もこの順で格納する。
+_ARRAY_FIELDS = (
+    ("header_offsets", "Q"),
+    ("compress_sizes", "Q"),
+    ("file_sizes", "Q"),
+    ("crcs", "I"),
+    ("compress_types", "H"),
+    ("flag_bits", "H"),
+    ("dos_times", "I"),
+)
+
+SIDECAR = "sidecar"
+INDEX_SUFFIX = ".zidx"
+
+
+# 自動判定の候補。スコアが同点の場合は前にあるものを優先する (従来どおり CP932 を既定とする)
+ENCODING_CANDIDATES = ("utf-8", "cp932", "gbk", "euc-kr")
+_FALLBACK_ENCODING = "cp437"
+_DETECT_SAMPLE_SIZE = 256
+
+
+def _script_score(text: str, encoding: str) -> int:
+    """
+    デコード結果の文字種からその文字コードらしさを点数化する。
+    かな (CP932)・ハングル (EUC-KR) は強い手掛かり、漢字は弱い手掛かり。
+    別の文字コードを当てはめたときに出やすい文字は減点する:
+    CP932 での半角カナ、EUC-KR での漢字 (現代韓国語のファイル名ではまず使われない)、
+    および制御文字・私用領域。
+    """
+    score = 0
+    for ch in text:
+        o = ord(ch)
+        if o < 0x80:
+            continue
+        if 0x3040 <= o <= 0x30FF:
+            score += 2 if encoding == "cp932" else 0
+        elif 0xAC00 <= o <= 0xD7A3:
+            score += 2
+        elif 0x4E00 <= o <= 0x9FFF:
+            score += -1 if encoding == "euc-kr" else 1
+        elif 0x3000 <= o <= 0x303F or 0xFF01 <= o <= 0xFF60:
+            score += 1
+        elif 0xFF61 <= o <= 0xFF9F:
+            score -= 2
+        elif o < 0xA0 or 0xE000 <= o <= 0xF8FF:
+            score -= 3
+    return score
+
+
+def detect_encoding(raw_names: List[bytes], candidates: tuple = ENCODING_CANDIDATES) -> str:
+    """
+    Guess the code page of ZIP entry names stored without the UTF-8 flag.
+
+    Every candidate that decodes all of `raw_names` is scored by the scripts it
+    produces; the best one wins. Falls back to CP437, which decodes anything.
+    """
+    best, best_score = _FALLBACK_ENCODING, None
+    for encoding in candidates:
+        try:
+            text = b"\0".join(raw_names).decode(encoding)
+        except UnicodeDecodeError:
+            continue
+        if encoding == "utf-8":
+            # UTF-8 の妥当なバイト列が偶然できることはまずないので即決する
+            return encoding
+        score = _script_score(text, encoding)
+        if best_score is None or score > best_score:
+            best, best_score = encoding, score
+    return best
+
+
+def decode_names(raw_names: List[bytes], flag_bits: List[int], encoding: Optional[str] = None) -> tuple:
+    """
+    Decode a whole name table.
+
+    Names with the UTF-8 flag are decoded as UTF-8. The others use `encoding`, or an
+    encoding detected once from a sample of their non-ASCII names. Each group is
+    decoded in a single batched call; per-name decoding (falling back to CP437) only
+    happens if the batch contains a name the chosen encoding cannot decode.
+
+    Returns:
+        (names, encoding) where encoding is None if no name needed a legacy code page.
+    """
+    names: List[str] = [""] * len(raw_names)
+    utf8 = [i for i, flags in enumerate(flag_bits) if flags & _FLAG_UTF8]
+    legacy = [i for i, flags in enumerate(flag_bits) if not flags & _FLAG_UTF8]
+
+    if encoding is None:
+        non_ascii = [raw_names[i] for i in legacy if not raw_names[i].isascii()]
+        if non_ascii:
+            step = max(1, len(non_ascii) // _DETECT_SAMPLE_SIZE)
+            encoding = detect_encoding(non_ascii[::step][:_DETECT_SAMPLE_SIZE])
+
+    for positions, codec in ((utf8, "utf-8"), (legacy, encoding or "ascii")):
+        if not positions:
+            continue
+        try:
+            decoded = b"\0".join([raw_names[i] for i in positions]).decode(codec).split("\0")
+        except UnicodeDecodeError:
+            decoded = [_decode_one(raw_names[i], codec) for i in positions]
+        for i, name in zip(positions, decoded):
+            names[i] = name
+    return names, encoding
+
+
+def _decode_one(raw: bytes, encoding: str) -> str:
+    try:
+        return raw.decode(encoding)
+    except UnicodeDecodeError:
+        return raw.decode(_FALLBACK_ENCODING)
+
+
+def default_cache_dir() -> Path:
+    """
+    Return the directory used to persist archive indexes.
+    `Z_LIB_CACHE_DIR` overrides the platform default user cache directory.
+    """
+    override = os.environ.get("Z_LIB_CACHE_DIR")
+    if override:
+        return Path(override)
+    if os.name == "nt":
+        base = os.environ.get("LOCALAPPDATA") or str(Path.home() / "AppData" / "Local")
+    else:
+        base = os.environ.get("XDG_CACHE_HOME") or str(Path.home() / ".cache")
+    return Path(base) / "z_lib" / "index"
+
+
+def index_path_for(archive_path: Union[str, Path], cache: Union[bool, str] = True) -> Optional[Path]:
+    """
+    Return where the index of `archive_path` is persisted, or None if caching is disabled.
+
+    Args:
+        archive_path: Path to the ZIP file.
+        cache: True for the user cache directory, SIDECAR for `<archive>.zidx`
+            next to the archive, any other string for that directory, False to disable.
+    """
+    if cache is False:
+        return None
+    archive = Path(archive_path).resolve()
+    if cache == SIDECAR:
+        return archive.with_name(archive.name + INDEX_SUFFIX)
+    directory = default_cache_dir() if cache is True else Path(cache)
+    key = hashlib.sha1(str(archive).encode("utf-8", "surrogatepass")).hexdigest()
+    return directory / f"{key}{INDEX_SUFFIX}"
+
+
+class ZipIndex:
+    """
+    Compact, array-backed view of a ZIP central directory.
+
+    Member `i` is described by `names[i]` and the i-th item of each array.
+    Names are decoded once at build time, so lookups never touch zipfile.ZipInfo.
+    """
+
+    def __init__(
+        self,
+        names: List[str],
+        archive_size: int = 0,
+        archive_mtime_ns: int = 0,
+        encoding: Optional[str] = None,
+        archive_path: Optional[str] = None,
+    ) -> None:
+        self.names = names
+        self.encoding = encoding  # Code page of names stored without the UTF-8 flag (None if all are ASCII/UTF-8)
+        self.archive_size = archive_size
+        self.archive_mtime_ns = archive_mtime_ns
+        self.archive_path = archive_path  # Absolute path the index was built from (lets the cache be pruned)
+        self.encoding_forced = False  # True if `encoding` was given by the caller rather than detected
+        self.header_offsets = array("Q")
+        self.compress_sizes = array("Q")
+        self.file_sizes = array("Q")
+        self.crcs = array("I")
+        self.compress_types = array("H")
+        self.flag_bits = array("H")
+        self.dos_times = array("I")
+        self._lookup: Optional[Dict[str, int]] = None
+        self._tree: Optional[Dict[str, Dict[str, int]]] = None
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    @property
+    def lookup(self) -> Dict[str, int]:
+        """Map of member name (without trailing slash) to its position."""
+        if self._lookup is None:
+            self._lookup = {name.rstrip("/"): i for i, name in enumerate(self.names)}
+        return self._lookup
+
+    def find(self, name: str) -> int:
+        """Return the position of `name`, or -1 if the archive has no such member."""
+        return self.lookup.get(name.strip("/"), -1)
+
+    def is_dir(self, i: int) -> bool:
+        return self.names[i].endswith("/")
+
+    def children(self, internal: str) -> Optional[Dict[str, int]]:
+        """
+        Return the direct children of directory `internal` as {name: position}.
+        Directories implied by member paths but not stored in the archive have position -1.
+        Returns None if `internal` is not a directory of the archive.
+        """
+        if self._tree is None:
+            self._tree = self._build_tree()
+        return self._tree.get(internal.strip("/"))
+
+    def child_is_dir(self, pos: int) -> bool:
+        """True if a position returned by `children` denotes a directory."""
+        return pos < 0 or self.names[pos].endswith("/")
+
+    def _build_tree(self) -> Dict[str, Dict[str, int]]:
+        tree: Dict[str, Dict[str, int]] = {"": {}}
+        for i, name in enumerate(self.names):
+            stripped = name.rstrip("/")
+            if not stripped:
+                continue
+            parent, _, leaf = stripped.rpartition("/")
+            # 未登録の親ディレクトリを上に向かって集め、浅い順に暗黙ディレクトリとして登録する
+            missing = []
+            node = parent
+            while node not in tree:
+                missing.append(node)
+                node = node.rpartition("/")[0]
+            for node in reversed(missing):
+                up, _, part = node.rpartition("/")
+                tree[node] = {}
+                tree[up].setdefault(part, -1)
+            tree[parent][leaf] = i
+            if name.endswith("/"):
+                tree.setdefault(stripped, {})
+        return tree
+
+    def date_time(self, i: int) -> tuple:
+        packed = self.dos_times[i]
+        d, t = packed >> 16, packed & 0xFFFF
+        return ((d >> 9) + 1980, (d >> 5) & 0xF, d & 0x1F, t >> 11, (t >> 5) & 0x3F, (t & 0x1F) * 2)
+
+    def mtime(self, i: int) -> float:
+        """Modification time of member `i` as a POSIX timestamp (local time, like zipfile)."""
+        try:
+            return time.mktime(self.date_time(i) + (0, 0, -1))
+        except (OverflowError, ValueError):
+            return self.archive_mtime_ns / 1e9
+
+    def stat(self, pos: int) -> os.stat_result:
+        """
+        Build an os.stat_result for a position returned by `find`/`children`.
+        Position -1 describes a directory that has no entry of its own (including the root).
+        """
+        if pos < 0:
+            mtime = self.archive_mtime_ns / 1e9
+            return os.stat_result((stat.S_IFDIR | 0o755, 0, 0, 1, 0, 0, 0, mtime, mtime, mtime))
+        mtime = self.mtime(pos)
+        if self.names[pos].endswith("/"):
+            mode, size = stat.S_IFDIR | 0o755, 0
+        else:
+            mode, size = stat.S_IFREG | 0o644, self.file_sizes[pos]
+        return os.stat_result((mode, 0, 0, 1, 0, 0, size, mtime, mtime, mtime))
+
+    def offset_order(self) -> List[int]:
+        """Member positions sorted by local header offset (sequential read order)."""
+        return sorted(range(len(self.names)), key=self.header_offsets.__getitem__)
+
+    def info(self, i: int) -> zipfile.ZipInfo:
+        """Build a zipfile.ZipInfo for a single member on demand."""
+        zinfo = zipfile.ZipInfo(self.names[i], self.date_time(i))
+        zinfo.compress_type = self.compress_types[i]
+        zinfo.compress_size = self.compress_sizes[i]
+        zinfo.file_size = self.file_sizes[i]
+        zinfo.CRC = self.crcs[i]
+        zinfo.flag_bits = self.flag_bits[i]
+        zinfo.header_offset = self.header_offsets[i]
+        return zinfo
+
+    def open_member(self, fp: BinaryIO, i: int) -> zipfile.ZipExtFile:
+        """
+        Open member `i` for reading from `fp`, an open binary handle on the archive.
+        The returned stream verifies the CRC at EOF, like ZipFile.open does.
+        """
+        if self.flag_bits[i] & _FLAG_ENCRYPTED:
+            raise RuntimeError(f"File {self.names[i]!r} is encrypted, password required for extraction")
+        fp.seek(self.data_offset(fp, i))
+        return zipfile.ZipExtFile(fp, "r", self.info(i))
+
+    def data_offset(self, fp: BinaryIO, i: int) -> int:
+        """Offset of member `i`'s compressed data in the archive, read from its local header."""
+        fp.seek(self.header_offsets[i])
+        header = fp.read(_LOCAL_HEADER.size)
+        if len(header) != _LOCAL_HEADER.size or header[:4] != _LOCAL_HEADER_SIGNATURE:
+            raise zipfile.BadZipFile(f"Bad magic number for file header: {self.names[i]!r}")
+        fields = _LOCAL_HEADER.unpack(header)
+        return self.header_offsets[i] + _LOCAL_HEADER.size + fields[10] + fields[11]
+
+    # ------------------------------------------------------------------
+    # 構築
+    # ------------------------------------------------------------------
+
+    @classmethod
+    def build(cls, archive_path: Union[str, Path], encoding: Optional[str] = None) -> "ZipIndex":
+        """
+        Parse the central directory of `archive_path` into a new index.
+        `encoding` forces the code page of non-UTF-8 names instead of detecting it.
+        """
+        st = os.stat(archive_path)
+        with open(archive_path, "rb") as fp:
+            count, cd_size, cd_offset, concat = _read_end_record(fp, st.st_size)
+            fp.seek(cd_offset + concat)
+            data = fp.read(cd_size)
+        if len(data) != cd_size:
+            raise zipfile.BadZipFile("Truncated central directory")
+
+        index = cls([], st.st_size, st.st_mtime_ns, archive_path=str(Path(archive_path).resolve()))
+        raw_names: List[bytes] = []
+        pos = 0
+        unpack = _CENTRAL_DIR.unpack_from
+        while pos < cd_size:
+            if pos + _CENTRAL_DIR.size > cd_size:
+                raise zipfile.BadZipFile("Truncated central directory entry")
+            fields = unpack(data, pos)
+            if fields[0] != _CENTRAL_DIR_SIGNATURE:
+                raise zipfile.BadZipFile("Bad magic number for central directory")
+            flags, method, dos_time, dos_date = fields[5], fields[6], fields[7], fields[8]
+            crc, compress_size, file_size = fields[9], fields[10], fields[11]
+            name_len, extra_len, comment_len = fields[12], fields[13], fields[14]
+            header_offset = fields[18]
+            pos += _CENTRAL_DIR.size
+            raw_name = data[pos:pos + name_len]
+            pos += name_len
+            if 0xFFFFFFFF in (file_size, compress_size, header_offset):
+                file_size, compress_size, header_offset = _apply_zip64_extra(
+                    data[pos:pos + extra_len], file_size, compress_size, header_offset
+                )
+            pos += extra_len + comment_len
+
+            raw_names.append(raw_name)
+            index.header_offsets.append(header_offset + concat)
+            index.compress_sizes.append(compress_size)
+            index.file_sizes.append(file_size)
+            index.crcs.append(crc)
+            index.compress_types.append(method)
+            index.flag_bits.append(flags)
+            index.dos_times.append((dos_date << 16) | dos_time)
+
+        if len(raw_names) != count:
+            raise zipfile.BadZipFile(f"Central directory lists {len(raw_names)} entries, expected {count}")
+
+        names, index.encoding = decode_names(raw_names, index.flag_bits, encoding)
+        index.encoding_forced = encoding is not None
+        intern = sys.intern
+        index.names = [intern(name) for name in names]
+        return index
+
+    # ------------------------------------------------------------------
+    # 永続化
+    # ------------------------------------------------------------------
+
+    def save(self, index_path: Union[str, Path]) -> None:
+        """Persist the index atomically to `index_path`."""
+        index_path = Path(index_path)
+        index_path.parent.mkdir(parents=True, exist_ok=True)
+        names_blob = "\0".join(self.names).encode("utf-8")
+        meta = json.dumps({
+            "archive_size": self.archive_size,
+            "archive_mtime_ns": self.archive_mtime_ns,
+            "archive_path": self.archive_path,
+            "count": len(self.names),
+            "encoding": self.encoding,
+            "encoding_forced": self.encoding_forced,
+            "names_len": len(names_blob),
+            "byteorder": sys.byteorder,
+        }).encode("utf-8")
+
+        tmp_path = index_path.with_name(f"{index_path.name}.{os.getpid()}.tmp")
+        try:
+            with open(tmp_path, "wb") as f:
+                f.write(_CACHE_HEADER.pack(_CACHE_MAGIC, _CACHE_VERSION, len(meta)))
+                f.write(meta)
+                for field, _typecode in _ARRAY_FIELDS:
+                    getattr(self, field).tofile(f)
+                f.write(names_blob)
+            os.replace(tmp_path, index_path)
+        except BaseException:
+            if tmp_path.exists():
+                tmp_path.unlink()
+            raise
+
+    @classmethod
+    def load(cls, index_path: Union[str, Path]) -> "ZipIndex":
+        """Read an index written by `save`. Raises ValueError if the file is not a valid index."""
+        with open(index_path, "rb") as f:
+            meta = _read_meta(f)
+            if meta["byteorder"] != sys.byteorder:
+                raise ValueError("Index was written on a machine with a different byte order")
+
+            count = meta["count"]
+            index = cls([], meta["archive_size"], meta["archive_mtime_ns"], meta["encoding"], meta["archive_path"])
+            index.encoding_forced = meta["encoding_forced"]
+            for field, typecode in _ARRAY_FIELDS:
+                arr = array(typecode)
+                arr.fromfile(f, count)
+                setattr(index, field, arr)
+            names_blob = f.read(meta["names_len"])
+            if len(names_blob) != meta["names_len"]:
+                raise ValueError("Truncated index name table")
+
+        names = names_blob.decode("utf-8").split("\0") if count else []
+        if len(names) != count:
+            raise ValueError("Index name table does not match entry count")
+        intern = sys.intern
+        index.names = [intern(name) for name in names]
+        return index
+
+    def matches(self, archive_path: Union[str, Path]) -> bool:
+        """True if the archive on disk still has the size and mtime this index was built from."""
+        try:
+            st = os.stat(archive_path)
+        except OSError:
+            return False
+        return st.st_size == self.archive_size and st.st_mtime_ns == self.archive_mtime_ns
+
+
+def mounted_index(handle: "ZipHandle") -> Optional[ZipIndex]:
+    """
+    Return the index of a mount if it can answer metadata queries for it.
+    In-memory mounts answer from their live MemoryTree (same lookup API).
+    Otherwise only unchanged read-only mounts qualify: rw mounts may diverge from the archive on disk.
+    """
+    tree = handle.get("tree")
+    if tree is not None:
+        return tree
+    # 読み取り専用でも一時ディレクトリへの書き込みは可能なので、変更があればインデックスは使わない
+    if handle["mode"] != "r" or handle.get("journal"):
+        return None
+    return handle.get("index")
+
+
+def load_index(
+    archive_path: Union[str, Path],
+    cache: Union[bool, str] = True,
+    encoding: Optional[str] = None,
+) -> ZipIndex:
+    """
+    Return the index of `archive_path`, reusing a persisted one when it is still valid.
+
+    A cached index is valid when the archive size and mtime match the values recorded
+    at build time and its names were decoded the way this call asks for: with the
+    forced `encoding`, or by detection when `encoding` is None.
+    Otherwise the central directory is parsed and the cache refreshed.
+    """
+    index_path = index_path_for(archive_path, cache)
+    if index_path is not None and index_path.exists():
+        try:
+            index = ZipIndex.load(index_path)
+            # 強制した文字コードで作ったインデックスは、同じ指定のときだけ使う (自動判定の結果とは限らない)
+            expected = index.encoding == encoding if encoding is not None else not index.encoding_forced
+            if index.matches(archive_path) and expected:
+                return index
+        except (OSError, ValueError, EOFError):
+            pass
+
+    index = ZipIndex.build(archive_path, encoding)
+    if index_path is not None:
+        try:
+            index.save(index_path)
+        except OSError:
+            # キャッシュは最適化にすぎないため、書き込めない環境では黙って諦める
+            pass
+        else:
+            if cache != SIDECAR:
+                _maybe_prune(index_path.parent)
+    return index
+
+
+def prune_cache(directory: Union[str, Path, None] = None, max_entries: int = CACHE_MAX_ENTRIES) -> int:
+    """
+    Delete cached indexes (files named by index_path_for) that can no longer be used: their archive was deleted or
+    rewritten (size/mtime changed), or they were written by another cache format.
+    If more than `max_entries` remain, the least recently written are deleted too.
+    Returns the number of cache files removed.
+    """
+    directory = Path(directory) if directory is not None else default_cache_dir()
+    try:
+        entries = list(os.scandir(directory))
+    except OSError:
+        return 0
+    now = time.time()
+    removed = 0
+    kept = []
+    for entry in entries:
+        try:
+            if _CACHE_TMP_FILE.match(entry.name):
+                # 書き込み途中で終了したプロセスの一時ファイル (save の命名)
+                if now - entry.stat().st_mtime > _STALE_TMP_AGE:
+                    os.unlink(entry.path)
+                continue
+            if not _CACHE_FILE.match(entry.name):
+                continue
+            mtime = entry.stat().st_mtime
+            if _cache_entry_valid(entry.path):
+                kept.append((mtime, entry.path))
+                continue
+            os.unlink(entry.path)
+            removed += 1
+        except OSError:
+            continue
+    if len(kept) > max_entries:
+        kept.sort()
+        for _mtime, path in kept[:len(kept) - max_entries]:
+            try:
+                os.unlink(path)
+                removed += 1
+            except OSError:
+                pass
+    return removed
+
+
+def _maybe_prune(directory: Path) -> None:
+    key = str(directory)
+    now = time.monotonic()
+    last = _last_prune.get(key)
+    if last is not None and now - last < _PRUNE_INTERVAL:
+        return
+    _last_prune[key] = now
+    prune_cache(directory)
+
+
+def _read_meta(f: BinaryIO) -> dict:
+    """Read the header and metadata of an index file. Raises ValueError if it is not a valid index."""
+    header = f.read(_CACHE_HEADER.size)
+    if len(header) != _CACHE_HEADER.size:
+        raise ValueError("Truncated index header")
+    magic, version, meta_len = _CACHE_HEADER.unpack(header)
+    if magic != _CACHE_MAGIC or version != _CACHE_VERSION:
+        raise ValueError("Unsupported index format")
+    return json.loads(f.read(meta_len))
+
+
+def _cache_entry_valid(index_path: str) -> bool:
+    """True if the cached index at `index_path` still describes its archive on disk."""
+    try:
+        with open(index_path, "rb") as f:
+            meta = _read_meta(f)
+        st = os.stat(meta["archive_path"])
+    except (OSError, ValueError, KeyError, TypeError):
+        return False
+    return st.st_size == meta["archive_size"] and st.st_mtime_ns == meta["archive_mtime_ns"]
+
+
+def _read_end_record(fp: BinaryIO, file_size: int) -> tuple:
+    """
+    Locate the end of central directory record.
+
+    Returns:
+        (entry count, central directory size, central directory offset, concat)
+        where `concat` is the number of bytes prepended to the archive (e.g. SFX stubs).
+    """
+    tail_size = min(file_size, _EOCD.size + _MAX_COMMENT)
+    fp.seek(file_size - tail_size)
+    tail = fp.read(tail_size)
+    pos = tail.rfind(_EOCD_SIGNATURE)
+    while pos >= 0 and pos + _EOCD.size > len(tail):
+        pos = tail.rfind(_EOCD_SIGNATURE, 0, pos)
+    if pos < 0:
+        raise zipfile.BadZipFile("File is not a zip file")
+
+    eocd = _EOCD.unpack_from(tail, pos)
+    count, cd_size, cd_offset = eocd[4], eocd[5], eocd[6]
+    eocd_location = file_size - tail_size + pos
+    end_location = eocd_location
+
+    locator_pos = pos - _EOCD64_LOCATOR.size
+    if locator_pos >= 0 and tail[locator_pos:locator_pos + 4] == _EOCD64_LOCATOR_SIGNATURE:
+        locator = _EOCD64_LOCATOR.unpack_from(tail, locator_pos)
+        eocd64_location = eocd_location - _EOCD64_LOCATOR.size - _EOCD64.size
+        fp.seek(eocd64_location)
+        record = fp.read(_EOCD64.size)
+        if len(record) == _EOCD64.size and record[:4] == _EOCD64_SIGNATURE:
+            eocd64 = _EOCD64.unpack(record)
+            count, cd_size, cd_offset = eocd64[7], eocd64[8], eocd64[9]
+            end_location = eocd64_location
+        elif locator[2] != 0xFFFFFFFFFFFFFFFF:
+            raise zipfile.BadZipFile("Corrupt zip64 end of central directory record")
+
+    concat = end_location - cd_size - cd_offset
+    if concat < 0:
+        raise zipfile.BadZipFile("Central directory offset is out of range")
+    return count, cd_size, cd_offset, concat
+
+
+def _apply_zip64_extra(extra: bytes, file_size: int, compress_size: int, header_offset: int) -> tuple:
+    """Replace 0xFFFFFFFF placeholders with the values stored in the Zip64 extra field."""
+    pos = 0
+    while pos + 4 <= len(extra):
+        tag, size = struct.unpack_from("<HH", extra, pos)
+        pos += 4
+        if tag == _ZIP64_EXTRA_ID:
+            values = iter(struct.unpack_from(f"<{size // 8}Q", extra, pos))
+            try:
+                if file_size == 0xFFFFFFFF:
+                    file_size = next(values)
+                if compress_size == 0xFFFFFFFF:
+                    compress_size = next(values)
+                if header_offset == 0xFFFFFFFF:
+                    header_offset = next(values)
+            except StopIteration:
+                raise zipfile.BadZipFile("Corrupt Zip64 extra field") from None
+            return file_size, compress_size, header_offset
+        pos += size
+    raise zipfile.BadZipFile("Missing Zip64 extra field for a large entry")
@@ -1,81 +1,456 @@
+import hashlib
 import os
 import shutil
+import stat
+import sys
 import tempfile
+import time
 import zipfile
+import zlib
+from functools import partial
 from pathlib import Path
-from .._types import ZipHandle, OpenMode
+from typing import BinaryIO, Callable, Dict, List, Optional, Set, Tuple, Union
+from .._types import ZipHandle, OpenMode, SaveStats, ChangeEvent
 from ..exceptions import ZipPathError
+from ..reaper import get_reaper
+from .zip_index import ZipIndex, load_index
 
-# Windows製ZIPはCP932(Shift-JIS)でエンコードされているが、
-# Python の zipfile は UTF-8 フラグなしのエントリを CP437 として扱うため文字化けが発生する。
-# このフラグで UTF-8 フラグの有無を確認し、なければ CP437バイト列 を CP932 として再デコードする。
 _FLAG_UTF8 = 0x800
 
+# 展開・保存時のコピーバッファ。メンバーのサイズに関係なくメモリ使用量はこの大きさで頭打ちになる
+DEFAULT_CHUNK_SIZE = 1024 * 1024
 
-def _decode_zip_filename(info: zipfile.ZipInfo) -> str:
+# _write_raw は zipfile.ZipFile の内部状態を直接操作する。動作を確認した CPython の範囲外や、
+# 前提の属性が見当たらない場合は圧縮済みデータのコピー (再利用・重複排除) をやめ、通常の書き込みに戻す
+_RAW_COPY_VERSIONS = ((3, 8), (3, 13))
+_RAW_COPY_ATTRS = ("fp", "filelist", "NameToInfo", "start_dir", "_writing", "_writecheck", "_didModify", "_seekable")
+
+def _extract_with_encoding(
+    index: ZipIndex, archive_path: Path, dest_dir: str, chunk_size: int = DEFAULT_CHUNK_SIZE
+) -> None:
+    """
+    文字化け対策済みのZIP展開処理。
+    インデックスでデコード済みのエントリ名を使い、ローカルヘッダのオフセット順に
+    アーカイブを先頭から順に読みながら dest_dir へ展開する。
+    各メンバーは chunk_size ごとにストリーミングするため、数GBのメンバーでもメモリは一定。
     """
-    ZIPエントリ名を正しくデコードして返す。
+    dest_root = Path(dest_dir)
+    created_dirs = {dest_root}
+    with open(archive_path, "rb") as fp:
+        for i in index.offset_order():
+            correct_name = index.names[i]
+            dest_path = dest_root / correct_name
+
+            if correct_name.endswith("/"):
+                # ディレクトリエントリ
+                dest_path.mkdir(parents=True, exist_ok=True)
+                created_dirs.add(dest_path)
+                continue
+
+            if dest_path.parent not in created_dirs:
+                dest_path.parent.mkdir(parents=True, exist_ok=True)
+                created_dirs.add(dest_path.parent)
+            with index.open_member(fp, i) as src, open(dest_path, "wb") as dst:
+                shutil.copyfileobj(src, dst, chunk_size)
+            # 更新時刻をZIPエントリの日時に揃え、stat の結果をインデックスと一致させる
+            mtime = index.mtime(i)
+            os.utime(dest_path, (mtime, mtime))
+
 
-    - UTF-8フラグ(bit11)が立っている場合: そのまま返す（zipfileが正しく処理済み）
-    - そうでない場合: CP437として読まれたバイト列をCP932として再デコードする
+class _LegacyNameZipInfo(zipfile.ZipInfo):
     """
-    if info.flag_bits & _FLAG_UTF8:
-        # zipfile が UTF-8 として正しくデコード済み
-        return info.filename
+    エントリ名を UTF-8 ではなく元のZIPの文字コード (CP932 など) で書き込む ZipInfo。
+    その文字コードで表現できない名前だけは通常どおり UTF-8 フラグ付きで書き込む。
+    """
+    name_encoding = "cp932"
 
-    # zipfile は UTF-8 フラグなしのエントリを CP437 として読むので、
-    # 一度 CP437 のバイト列に戻してから CP932 として解釈する
-    raw_bytes = info.filename.encode("cp437")
-    try:
-        return raw_bytes.decode("cp932")
-    except (UnicodeDecodeError, ValueError):
-        # CP932 でも失敗した場合は元の文字列を返す（フォールバック）
-        return info.filename
+    def _encodeFilenameFlags(self):
+        try:
+            return self.filename.encode(self.name_encoding), self.flag_bits & ~_FLAG_UTF8
+        except UnicodeEncodeError:
+            return super()._encodeFilenameFlags()
 
 
-def _extract_with_encoding(zf: zipfile.ZipFile, dest_dir: str) -> None:
+def _make_zipinfo(
+    zf: zipfile.ZipFile,
+    arcname: str,
+    encoding: Optional[str],
+    file_path: Optional[Path] = None,
+    mtime: Optional[float] = None,
+) -> zipfile.ZipInfo:
     """
-    文字化け対策済みのZIP展開処理。
-    各エントリ名を正しくデコードしてからdest_dirへ展開する。
+    arcname 用の ZipInfo を作る。file_path があればその stat から、なければ mtime から日時を決める。
+    ロード元のZIPが UTF-8 以外の文字コードだった場合は、その文字コードで名前を書き戻す
+    (zipfile の内部実装を確認できない Python では UTF-8 フラグ付きの名前で書き込む)。
     """
-    for info in zf.infolist():
-        correct_name = _decode_zip_filename(info)
-        dest_path = Path(dest_dir) / correct_name
+    legacy = bool(encoding) and encoding != "utf-8" and not arcname.isascii() and _legacy_names_supported()
+    cls = _LegacyNameZipInfo if legacy else zipfile.ZipInfo
+    if file_path is not None:
+        zinfo = cls.from_file(file_path, arcname)
+    else:
+        date_time = time.localtime(time.time() if mtime is None else mtime)[:6]
+        # ZIP の日時は 1980 年より前を表現できない
+        zinfo = cls(arcname, date_time if date_time[0] >= 1980 else (1980, 1, 1, 0, 0, 0))
+        zinfo.external_attr = (stat.S_IFREG | 0o644) << 16
+    if legacy:
+        zinfo.name_encoding = encoding
+    zinfo.compress_type = zf.compression
+    if hasattr(zinfo, "compress_level"):  # Python 3.13+
+        zinfo.compress_level = zf.compresslevel
+    else:
+        zinfo._compresslevel = zf.compresslevel
+    return zinfo
+
+
+def _legacy_names_supported() -> bool:
+    """Whether _LegacyNameZipInfo can override this interpreter's private name encoding hook."""
+    low, high = _RAW_COPY_VERSIONS
+    return low <= sys.version_info[:2] <= high and hasattr(zipfile.ZipInfo, "_encodeFilenameFlags")
+
+
+def _raw_copy_supported(zf: zipfile.ZipFile) -> bool:
+    """Whether _write_raw can drive this interpreter's zipfile internals."""
+    low, high = _RAW_COPY_VERSIONS
+    return (
+        low <= sys.version_info[:2] <= high
+        and all(hasattr(zf, name) for name in _RAW_COPY_ATTRS)
+        and hasattr(zipfile.ZipInfo, "FileHeader")
+    )
+
+
+def _write_raw(
+    zf: zipfile.ZipFile,
+    zinfo: zipfile.ZipInfo,
+    source: zipfile.ZipInfo,
+    src_fp: BinaryIO,
+    data_offset: int,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+) -> None:
+    """
+    圧縮済みデータを再圧縮せずにそのまま zf へ書き込む (名前・日時・属性は zinfo のもの)。
+    source (圧縮方式・CRC・サイズ) のデータが src_fp の data_offset から始まっている必要がある。
+    src_fp は元のZIPでも、シーク可能な zf.fp 自身 (重複排除) でもよい。
+    zipfile の ZipFile._open_to_write / _ZipWriteFile.close と同じ手順で内部状態を更新する。
+    """
+    if zf._writing:
+        raise ValueError("Can't write to the ZIP file while there is another write handle open on it.")
+    zinfo.compress_type = source.compress_type
+    zinfo.CRC = source.CRC
+    zinfo.compress_size = source.compress_size
+    zinfo.file_size = source.file_size
+    # UTF-8 フラグは名前のエンコード時に、データディスクリプタは不要なので落とす
+    zinfo.flag_bits = source.flag_bits & ~(_FLAG_UTF8 | 0x08)
+    if not zinfo.external_attr:
+        zinfo.external_attr = 0o600 << 16
+    zip64 = zinfo.file_size > zipfile.ZIP64_LIMIT or zinfo.compress_size > zipfile.ZIP64_LIMIT
+
+    if zf._seekable:
+        zf.fp.seek(zf.start_dir)
+    zinfo.header_offset = zf.fp.tell()
+    zf._writecheck(zinfo)
+    zf._didModify = True
+    zf.fp.write(zinfo.FileHeader(zip64))
+    write_pos = zf.fp.tell()
+
+    same_file = src_fp is zf.fp
+    copied = 0
+    while copied < zinfo.compress_size:
+        src_fp.seek(data_offset + copied)
+        chunk = src_fp.read(min(chunk_size, zinfo.compress_size - copied))
+        if not chunk:
+            raise zipfile.BadZipFile(f"Truncated member data while copying {source.filename!r}")
+        if same_file:
+            zf.fp.seek(write_pos + copied)
+        zf.fp.write(chunk)
+        copied += len(chunk)
+
+    zf.start_dir = zf.fp.tell()
+    zf.filelist.append(zinfo)
+    zf.NameToInfo[zinfo.filename] = zinfo
+
+
+def _is_within(path: str, prefix: str) -> bool:
+    return not prefix or path == prefix or path.startswith(prefix + "/")
+
+
+def _tainted_paths(events: List[ChangeEvent]) -> Set[str]:
+    """
+    ジャーナルを先頭から再生し、作成・書き込みの記録がある現在のパスを集める。
+    ディレクトリのパスも含まれるが、配下の扱いは _OriginalMembers.find が決める。
+    """
+    tainted: Set[str] = set()
+    for event in events:
+        kind, src, dst = event["kind"], event["internal"], event["internal_dest"]
+        if kind in ("created", "modified"):
+            tainted.add(src)
+        elif kind == "deleted":
+            tainted = {p for p in tainted if not _is_within(p, src)}
+        elif kind == "moved" and dst is not None:
+            # 移動先にあったものは上書きされ、移動元の変更は移動先へ引き継がれる
+            moved = {dst + p[len(src):] for p in tainted if _is_within(p, src)}
+            tainted = {p for p in tainted if not _is_within(p, src) and not _is_within(p, dst)} | moved
+    return tainted
+
+
+def _crc32(file_path: Path, chunk_size: int) -> int:
+    crc = 0
+    with open(file_path, "rb") as f:
+        while True:
+            chunk = f.read(chunk_size)
+            if not chunk:
+                return crc
+            crc = zlib.crc32(chunk, crc)
+
+
+class _OriginalMembers:
+    """
+    Finds files in the temp dir whose content is still that of a member of the
+    original archive, possibly under a new name, so save can copy the member's
+    compressed bytes instead of recompressing.
+
+    A file qualifies when, after undoing the journaled moves, its original name is a
+    member stored with the output's compression method, nothing was written to it
+    through Z_Lib, and its size and mtime still match the member (extraction stamps
+    the member mtime). The CRC is checked as well once real paths were handed out via
+    resolve(), since writes may bypass the journal, and for files below a directory
+    that was created or copied through Z_Lib, whose contents are not journaled one by one.
+    """
+
+    def __init__(self, index: ZipIndex, archive_path: str, events: List[ChangeEvent], verify_crc: bool) -> None:
+        self.index = index
+        self.archive_path = archive_path
+        self.verify_crc = verify_crc
+        self._moves = [(e["internal"], e["internal_dest"]) for e in events if e["kind"] == "moved" and e["internal_dest"] is not None]
+        self._tainted = _tainted_paths(events)
+        self._fp: Optional[BinaryIO] = None
+
+    @classmethod
+    def for_handle(cls, handle: ZipHandle) -> Optional["_OriginalMembers"]:
+        index = handle.get("index")
+        # 元のZIPがマウント後に書き換えられていたら、そこからはコピーできない
+        if index is None or not index.matches(handle["path"]):
+            return None
+        journal = handle.get("journal")
+        events = journal.since(0) if journal is not None else []
+        return cls(index, handle["path"], events, verify_crc=journal is None or journal.exposed)
+
+    def origin(self, arcname: str) -> str:
+        """Name the file had in the original archive, undoing the journaled moves."""
+        name = arcname
+        for src, dst in reversed(self._moves):
+            if _is_within(name, dst):
+                name = src + name[len(dst):]
+        return name
+
+    def find(self, zinfo: zipfile.ZipInfo, file_path: Path, chunk_size: int) -> int:
+        """Position of the unchanged original member stored at file_path as zinfo, or -1."""
+        arcname = zinfo.filename
+        if arcname in self._tainted:
+            return -1
+        verify_crc = self.verify_crc
+        name = arcname.rpartition("/")[0]
+        while name:
+            if name in self._tainted:
+                # mkdir で作っただけのフォルダへ移動したファイルは再利用したいが、
+                # copytree などでフォルダごと作られた中身は個別に記録されないため CRC で確かめる
+                verify_crc = True
+                break
+            name = name.rpartition("/")[0]
+
+        index = self.index
+        i = index.find(self.origin(arcname))
+        # 暗号化されたメンバーや、書き出し先と圧縮方式が異なるメンバーは圧縮し直す
+        if i < 0 or index.is_dir(i) or index.flag_bits[i] & 0x1 or index.compress_types[i] != zinfo.compress_type:
+            return -1
+        st = os.stat(file_path)
+        if st.st_size != index.file_sizes[i] or st.st_mtime_ns != round(index.mtime(i) * 1e9):
+            return -1
+        if verify_crc and _crc32(file_path, chunk_size) != index.crcs[i]:
+            return -1
+        return i
+
+    def copy(self, zf: zipfile.ZipFile, zinfo: zipfile.ZipInfo, i: int, chunk_size: int) -> None:
+        if self._fp is None:
+            self._fp = open(self.archive_path, "rb")
+        offset = self.index.data_offset(self._fp, i)
+        _write_raw(zf, zinfo, self.index.info(i), self._fp, offset, chunk_size)
+
+    def close(self) -> None:
+        if self._fp is not None:
+            self._fp.close()
+            self._fp = None
 
-        if correct_name.endswith("/"):
-            # ディレクトリエントリ
-            dest_path.mkdir(parents=True, exist_ok=True)
-        else:
-            dest_path.parent.mkdir(parents=True, exist_ok=True)
-            with zf.open(info) as src, open(dest_path, "wb") as dst:
-                shutil.copyfileobj(src, dst)
+
+# (ZipInfo, 非圧縮サイズ, 内容を開く関数, 一時ディレクトリ上のパス (メモリ上なら None))
+_Payload = Tuple[zipfile.ZipInfo, int, Callable[[], BinaryIO], Optional[Path]]
+
+
+def _digest(open_src: Callable[[], BinaryIO], chunk_size: int) -> bytes:
+    h = hashlib.blake2b(digest_size=32)
+    with open_src() as src:
+        while True:
+            chunk = src.read(chunk_size)
+            if not chunk:
+                break
+            h.update(chunk)
+    return h.digest()
+
+
+def _write_payloads(
+    zf: zipfile.ZipFile,
+    payloads: List[_Payload],
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    dedup: bool = False,
+    originals: Optional[_OriginalMembers] = None,
+) -> SaveStats:
+    """
+    payloads を順に zf へ書き込み、統計を返す。
+    - originals があれば、元のZIPから内容が変わっていないメンバーは圧縮済みデータをそのままコピーする
+    - dedup なら、内容が同一のメンバーは最初の1つだけを圧縮し、以降は圧縮済みデータと CRC を使い回す
+      (ハッシュを取るのは同じサイズのメンバーが他にもあるものだけ。zf.fp はシーク・読み出し可能である必要がある)
+    """
+    if not _raw_copy_supported(zf):
+        dedup, originals = False, None
+    reused_members = [
+        originals.find(zinfo, file_path, chunk_size) if originals is not None and file_path is not None else -1
+        for zinfo, _size, _open, file_path in payloads
+    ]
+
+    sizes: Dict[int, int] = {}
+    if dedup:
+        for (_zinfo, size, _open, _path), member in zip(payloads, reused_members):
+            if member < 0:
+                sizes[size] = sizes.get(size, 0) + 1
+    start = time.perf_counter()
+    digests = [
+        _digest(open_src, chunk_size) if member < 0 and size and sizes.get(size, 0) > 1 else None
+        for (_zinfo, size, open_src, _path), member in zip(payloads, reused_members)
+    ]
+    hash_seconds = time.perf_counter() - start
+
+    written: Dict[bytes, Tuple[zipfile.ZipInfo, int]] = {}
+    compress_seconds = 0.0
+    compressed_bytes = duplicate_bytes = duplicates = reused = reused_bytes = 0
+    for (zinfo, size, open_src, _path), member, digest in zip(payloads, reused_members, digests):
+        if member >= 0:
+            originals.copy(zf, zinfo, member, chunk_size)
+            reused += 1
+            reused_bytes += zinfo.compress_size
+            continue
+        if digest is not None and digest in written:
+            first, data_offset = written[digest]
+            _write_raw(zf, zinfo, first, zf.fp, data_offset, chunk_size)
+            duplicates += 1
+            duplicate_bytes += size
+            continue
+
+        start = time.perf_counter()
+        zinfo.file_size = size
+        # 4GB を超えるメンバーはローカルヘッダの時点で Zip64 にしておく必要がある
+        # (書き込み後にサイズが分かってからでは、ヘッダを Zip64 に拡張できない)
+        with open_src() as src, zf.open(zinfo, "w", force_zip64=size > zipfile.ZIP64_LIMIT) as dst:
+            data_offset = zf.fp.tell()
+            shutil.copyfileobj(src, dst, chunk_size)
+        compress_seconds += time.perf_counter() - start
+        compressed_bytes += size
+        if digest is not None:
+            written[digest] = (zinfo, data_offset)
+
+    return SaveStats(
+        files=len(payloads),
+        unique=len(payloads) - duplicates - reused,
+        duplicates=duplicates,
+        reused=reused,
+        reused_bytes=reused_bytes,
+        total_bytes=sum(payload[1] for payload in payloads),
+        deduplicated_bytes=duplicate_bytes,
+        dedup_ratio=(compressed_bytes + duplicate_bytes) / compressed_bytes if compressed_bytes else 1.0,
+        hash_seconds=hash_seconds,
+        compress_seconds=compress_seconds,
+        cpu_saved_seconds=compress_seconds / compressed_bytes * duplicate_bytes if compressed_bytes else 0.0,
+    )
+
+
+def _tree_payloads(zf: zipfile.ZipFile, temp_dir: Path, encoding: Optional[str]) -> List[_Payload]:
+    """一時ディレクトリ配下のファイルを、書き込み順 (os.walk 順) の payload にする。"""
+    payloads: List[_Payload] = []
+    for root, _dirs, files in os.walk(temp_dir):
+        for file in files:
+            file_path = Path(root) / file
+            zinfo = _make_zipinfo(zf, file_path.relative_to(temp_dir).as_posix(), encoding, file_path=file_path)
+            payloads.append((zinfo, zinfo.file_size, partial(open, file_path, "rb"), file_path))
+    return payloads
 
 
 class ZipFileBackend:
-    def open(self, path: str, create: bool, mode: OpenMode = "rw") -> ZipHandle:
-        path_obj = Path(path).resolve()
+    def __init__(
+        self,
+        index_cache: Union[bool, str] = True,
+        deferred_cleanup: bool = True,
+        compression: int = zipfile.ZIP_DEFLATED,
+        compresslevel: Optional[int] = None,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+    ) -> None:
+        """
+        Args:
+            index_cache: Where central-directory indexes are persisted between mounts.
+                True for the user cache directory, "sidecar" for `<archive>.zidx`
+                next to the archive, a directory path, or False to disable.
+            deferred_cleanup: If True, close() hands the temp dir to the background
+                reaper instead of deleting it synchronously.
+            compression, compresslevel: zipfile settings used when saving (and exporting).
+            chunk_size: Buffer size for streaming members during extraction and saving.
+                Memory use stays bounded by it regardless of member size.
+        """
+        self._index_cache = index_cache
+        self._deferred_cleanup = deferred_cleanup
+        self._compression = compression
+        self._compresslevel = compresslevel
+        self._chunk_size = chunk_size
 
-        if not path_obj.exists():
-            if not create:
-                raise FileNotFoundError(f"ZIP file not found: {path}")
+    def open(self, path: str, create: bool, mode: OpenMode = "rw", encoding: Optional[str] = None) -> ZipHandle:
+        path_obj = Path(path).resolve()
+        index = self._load_index(path_obj, path, create, encoding)
 
         # 一時ディレクトリを作成
-        temp_dir = tempfile.mkdtemp(prefix="z_lib_")
+        temp_dir = get_reaper().make_temp_dir()
 
-        if path_obj.exists() and zipfile.is_zipfile(path_obj):
-            # 文字化け対策済みの展開関数を使用
-            with zipfile.ZipFile(path_obj, "r") as zf:
-                _extract_with_encoding(zf, temp_dir)
-        elif path_obj.exists() and not zipfile.is_zipfile(path_obj):
-            shutil.rmtree(temp_dir)
-            raise ZipPathError(f"File exists but is not a valid ZIP file: {path}")
+        if index is not None:
+            try:
+                # 文字化け対策済みの展開関数を使用
+                _extract_with_encoding(index, path_obj, temp_dir, self._chunk_size)
+            except BaseException:
+                get_reaper().remove(temp_dir)
+                raise
 
         return ZipHandle(
             path=str(path_obj),
             temp_dir=temp_dir,
             mode=mode,
+            index=index,
+            encoding=index.encoding if index is not None else encoding,
+            backend="zipfile",
         )
 
+    def _load_index(self, path_obj: Path, path: str, create: bool, encoding: Optional[str]) -> Optional[ZipIndex]:
+        """Index of an existing archive, or None for a new one (create=True)."""
+        if not path_obj.exists():
+            if not create:
+                raise FileNotFoundError(f"ZIP file not found: {path}")
+            return None
+        try:
+            return load_index(path_obj, self._index_cache, encoding)
+        except zipfile.BadZipFile:
+            raise ZipPathError(f"File exists but is not a valid ZIP file: {path}") from None
+
+    def materialize(self, handle: ZipHandle) -> str:
+        """Return the directory holding the mount's files (always on disk for this backend)."""
+        return handle["temp_dir"]
+
+    def read(self, handle: ZipHandle, internal_path: str) -> bytes:
+        with open(Path(handle["temp_dir"]) / internal_path, "rb") as f:
+            return f.read()
+
     def close(self, handle: ZipHandle, save: bool) -> None:
         temp_dir = Path(handle["temp_dir"])
         original_path = Path(handle["path"])
@@ -83,31 +458,81 @@ class ZipFileBackend:
 
         try:
             if save and mode == "rw" and temp_dir.exists():
-                if not original_path.parent.exists():
-                    original_path.parent.mkdir(parents=True, exist_ok=True)
-
-                fd, temp_zip_path = tempfile.mkstemp(
-                    dir=original_path.parent, suffix=".tmp_zip"
-                )
-                os.close(fd)
-
-                try:
-                    with zipfile.ZipFile(
-                        temp_zip_path, "w", compression=zipfile.ZIP_DEFLATED
-                    ) as zf:
-                        for root, _dirs, files in os.walk(temp_dir):
-                            for file in files:
-                                file_path = Path(root) / file
-                                arcname = file_path.relative_to(temp_dir)
-                                zf.write(file_path, arcname)
-
-                    shutil.move(temp_zip_path, original_path)
-
-                except Exception:
-                    if os.path.exists(temp_zip_path):
-                        os.remove(temp_zip_path)
-                    raise
+                self._write_to_path(handle, original_path, self._compression, self._compresslevel)
+
+        finally:
+            # 一時ディレクトリが既に消されていてもロックを手放すため、常にリーパーへ渡す
+            if self._deferred_cleanup:
+                # 数百万ファイルの削除で unload が止まらないよう、リネームだけして後で消す
+                get_reaper().discard(str(temp_dir))
+            else:
+                get_reaper().remove(str(temp_dir))
+
+    def export(
+        self,
+        handle: ZipHandle,
+        dest: Union[str, os.PathLike, BinaryIO],
+        compression: Optional[int] = None,
+        compresslevel: Optional[int] = None,
+    ) -> None:
+        """
+        Write a ZIP of the current mount state to `dest` without unmounting.
+
+        Args:
+            dest: A path (written atomically via a staging file) or a writable binary
+                stream. Streams need not be seekable and are left open.
+            compression, compresslevel: Override the backend's save settings.
+        """
+        compression = self._compression if compression is None else compression
+        compresslevel = self._compresslevel if compresslevel is None else compresslevel
+        if isinstance(dest, (str, os.PathLike)):
+            self._write_to_path(handle, Path(dest), compression, compresslevel)
+        else:
+            with zipfile.ZipFile(dest, "w", compression=compression, compresslevel=compresslevel) as zf:
+                self._write_members(zf, handle)
+
+    def _write_to_path(self, handle: ZipHandle, dest: Path, compression: int, compresslevel: Optional[int]) -> None:
+        """同じディレクトリのステージングファイルに書き出してから dest へ置き換える。"""
+        if not dest.parent.exists():
+            dest.parent.mkdir(parents=True, exist_ok=True)
 
+        fd, temp_zip_path = tempfile.mkstemp(
+            dir=dest.parent, suffix=".tmp_zip"
+        )
+        os.close(fd)
+
+        try:
+            with zipfile.ZipFile(
+                temp_zip_path, "w", compression=compression, compresslevel=compresslevel
+            ) as zf:
+                self._write_members(zf, handle)
+
+            shutil.move(temp_zip_path, dest)
+
+        except Exception:
+            if os.path.exists(temp_zip_path):
+                os.remove(temp_zip_path)
+            raise
+
+    def _write_members(self, zf: zipfile.ZipFile, handle: ZipHandle) -> None:
+        payloads = _tree_payloads(zf, Path(handle["temp_dir"]), handle.get("encoding"))
+        originals = _OriginalMembers.for_handle(handle)
+        try:
+            handle["save_stats"] = _write_payloads(
+                zf, payloads, self._chunk_size, dedup=_dedup_enabled(zf, handle), originals=originals
+            )
         finally:
-            if temp_dir.exists():
-                shutil.rmtree(temp_dir, ignore_errors=True)
+            if originals is not None:
+                originals.close()
+
+
+def _dedup_enabled(zf: zipfile.ZipFile, handle: ZipHandle) -> bool:
+    # 圧縮済みデータを書き込み先から読み戻すため、シークできない・読めないストリーム
+    # (open(path, "wb") やリダイレクトされた stdout など) への書き出しでは通常の書き込みに戻す
+    if not handle.get("dedup") or not getattr(zf, "_seekable", False):
+        return False
+    readable = getattr(zf.fp, "readable", None)
+    try:
+        return bool(readable and readable())
+    except ValueError:
+        return False
@@ -1,47 +1,194 @@
 import atexit
-from typing import Dict, List, Optional, Union, IO
+import codecs
+import io
+import math
+import os
+import time
+import weakref
+from collections import OrderedDict
+from collections import deque
+from functools import cached_property
+from itertools import count, islice
+from typing import BinaryIO, Callable, Dict, Iterable, Iterator, List, Optional, Tuple, TypeVar, Union, IO, TYPE_CHECKING
 from pathlib import Path
 
-from ._types import ZipHandle, OpenMode
-from .exceptions import ZipNotLoadedError, ZipAlreadyLoadedError, ZipPathError
-from .path_resolver import normalize_path, resolve_to_real_path
-from .backend.zipfile_backend import ZipFileBackend
-from .namespaces.z_os import Z_OS
-from .namespaces.z_shutil import Z_Shutil
+from ._types import ZipHandle, OpenMode, VerifyReport, ChangeEvent, ChangeKind, SaveStats
+from .exceptions import ZipNotLoadedError, ZipAlreadyLoadedError, ZipPathError, ZipIntegrityError
+from .path_resolver import normalize_path, find_longest_match_handle, resolve_match, match_many, split_zip_path
+from .mount import ZipMount
+from .journal import ChangeJournal
+
+# バックエンド・名前空間・スレッドプールは初回使用時に import する。
+# resolve だけを呼ぶ短命なワーカーでは zipfile / shutil / tempfile を読み込まずに済む
+if TYPE_CHECKING:
+    from .backend.protocol import ZipBackend
+    from .namespaces.z_os import Z_OS
+    from .namespaces.z_shutil import Z_Shutil
+    from .namespaces.z_glob import Z_Glob
+    from .prefetch import Prefetcher
+
+_T = TypeVar("_T")
+_R = TypeVar("_R")
 
 class Z_Lib:
-    def __init__(self):
+    def __init__(
+        self,
+        idle_timeout: Optional[float] = None,
+        max_mounted: Optional[int] = None,
+        chunk_size: Optional[int] = None,
+        backend: str = "zipfile",
+        memory_threshold: Optional[int] = None,
+    ):
+        """
+        Args:
+            idle_timeout: If set, a ZIP whose last reference is released stays mounted
+                and is unmounted once it has not been accessed for this many seconds.
+                There is no timer: expiry is only checked by load_zip, unload_zip and
+                collect_idle, so a long-running process that stops loading ZIPs must
+                call collect_idle() periodically to free idle mounts.
+                If None, it is unmounted as soon as its last reference is released.
+            max_mounted: Soft limit on mounted ZIPs. Loading beyond it unmounts the
+                least recently used unreferenced ZIPs first.
+            chunk_size: Buffer size used to stream members when mounting and saving
+                (default 1 MiB). Memory use does not grow with member size.
+            backend: Name of the default backend ("zipfile", "memory" or one added
+                with register_backend).
+            memory_threshold: If set, archives up to this many bytes are mounted with
+                the in-memory backend unless load_zip names a backend explicitly.
+        """
         self._loaded_zips: Dict[str, ZipHandle] = {}
-        self._backend = ZipFileBackend()
-        
-        # Ensure cleanup on exit
-        atexit.register(self._cleanup)
-        
-        self.os = Z_OS(self)
-        self.shutil = Z_Shutil(self)
+        self._backends: Dict[str, "ZipBackend"] = {}
+        self._backend_options = {"chunk_size": chunk_size} if chunk_size else {}
+        self._default_backend = backend
+        self._memory_threshold = memory_threshold
+        self.last_save_stats: Optional[SaveStats] = None  # Statistics of the last save or export
+
+        # 参照カウントと、最終アクセス時刻 (LRU 順: 先頭ほど古い)
+        self._mount_refs: Dict[str, int] = {}
+        # マウントごとの世代番号。アンロード後に同じパスを再マウントしても古い ZipMount が効かないようにする
+        self._mount_ids: Dict[str, int] = {}
+        self._next_mount_id = count(1)
+        self._last_used: "OrderedDict[str, float]" = OrderedDict()
+        self._idle_timeout = idle_timeout
+        self._max_mounted = max_mounted
+        self._next_idle_check = 0.0
 
-    def load_zip(self, *paths: str, create: bool = False, mode: OpenMode = "rw") -> None:
+        # Ensure cleanup on exit (one process-wide atexit hook for all instances)
+        _track_instance(self)
+
+    @cached_property
+    def os(self) -> "Z_OS":
+        from .namespaces.z_os import Z_OS
+        return Z_OS(self)
+
+    @cached_property
+    def shutil(self) -> "Z_Shutil":
+        from .namespaces.z_shutil import Z_Shutil
+        return Z_Shutil(self)
+
+    @cached_property
+    def glob(self) -> "Z_Glob":
+        from .namespaces.z_glob import Z_Glob
+        return Z_Glob(self)
+
+    def load_zip(
+        self,
+        *paths: str,
+        create: bool = False,
+        mode: OpenMode = "rw",
+        encoding: Optional[str] = None,
+        verify: bool = False,
+        backend: Optional[str] = None,
+        dedup: bool = False,
+    ) -> ZipMount:
         """
-        Load one or more ZIP files.
+        Load one or more ZIP files and take a reference on each of them.
+        `encoding` overrides the detected code page of entry names stored without
+        the UTF-8 flag (e.g. "cp932", "gbk"); it is also used when saving.
+        `verify=True` checks every member's CRC before extracting anything and
+        raises ZipIntegrityError if any is corrupt.
+        `backend` picks the backend for these archives (default: by memory_threshold,
+        else the Z_Lib default).
+        `dedup=True` compresses identical files only once when saving or exporting;
+        the statistics are printed and kept in `last_save_stats`.
+
+        Loading a ZIP that is already mounted shares the existing mount with the
+        options it was first loaded with; differing mode, encoding, backend or dedup
+        options are ignored and a warning is printed.
+        Returns a ZipMount; releasing it (or leaving its `with` block) drops the references.
         """
-        for path in paths:
-            # 正規化だけでなく、絶対パスに解決して一貫性を持たせる
-            abs_path = Path(path).resolve()
-            norm_path = normalize_path(str(abs_path))
-            
-            if norm_path in self._loaded_zips:
-                print(f"  📦 [Z_Lib] LOAD  ⚡ already loaded — skipped   › {norm_path}")
-                continue
+        self._expire_idle()
+        taken: List[Tuple[str, int, bool]] = []
+        try:
+            for path in paths:
+                taken.append(self._load_one(path, create, mode, encoding, verify, backend, dedup))
+        except BaseException:
+            # 途中で失敗したら、それまでに取った参照を戻す (新たにマウントしたものは保存せずに閉じる)
+            for key, mount_id, mounted in taken:
+                if not mounted:
+                    self._release(key, mount_id)
+                elif self._mount_ids.get(key) == mount_id:
+                    self._unmount(key, save=False)
+            raise
+        return ZipMount(self, [key for key, _, _ in taken], [mount_id for _, mount_id, _ in taken])
+
+    def _load_one(
+        self,
+        path: str,
+        create: bool,
+        mode: OpenMode,
+        encoding: Optional[str],
+        verify: bool,
+        backend: Optional[str],
+        dedup: bool,
+    ) -> Tuple[str, int, bool]:
+        """Mount (or share) one ZIP for load_zip. Returns (key, mount id, newly mounted)."""
+        # 正規化だけでなく、絶対パスに解決して一貫性を持たせる
+        abs_path = Path(path).resolve()
+        norm_path = normalize_path(str(abs_path))
+        
+        if norm_path in self._loaded_zips:
+            refs = self._mount_refs[norm_path] = self._mount_refs.get(norm_path, 0) + 1
+            self._touch(norm_path)
+            print(f"  📦 [Z_Lib] LOAD  ⚡ already loaded — shared  refs={refs}   › {norm_path}")
+            # 共有するマウントは最初の load_zip の設定のまま。要求と食い違う場合は警告する
+            mismatches = _shared_mismatches(self._loaded_zips[norm_path], mode, encoding, backend, dedup)
+            if mismatches:
+                print(f"     └─ ⚠️  options ignored, existing mount kept: {', '.join(mismatches)}")
+            return norm_path, self._mount_ids[norm_path], False
+
+        if verify and abs_path.exists():
+            report = self.verify(str(abs_path))
+            if report["bad"]:
+                raise ZipIntegrityError(
+                    f"ZIP file failed verification ({len(report['bad'])} bad member(s)): {norm_path}"
+                )
+
+        # Sweep temp dirs orphaned by crashed processes (once per process; the scan and
+        # the deletions both run in background threads, so mounting does not wait)
+        from .reaper import get_reaper
+        get_reaper()
 
-            action = "create" if create else "open"
-            print(f"  📦 [Z_Lib] LOAD  ▶  mode={mode!r}  [{action}]   › {norm_path}")
-            handle = self._backend.open(path, create=create, mode=mode)
-            self._loaded_zips[norm_path] = handle
-            print(f"     └─ ✅ mounted   temp_dir={handle['temp_dir']}")
+        self._evict_for_new_mount()
+        action = "create" if create else "open"
+        print(f"  📦 [Z_Lib] LOAD  ▶  mode={mode!r}  [{action}]   › {norm_path}")
+        backend_name = self._choose_backend(abs_path, backend)
+        handle = self._backend_named(backend_name).open(path, create=create, mode=mode, encoding=encoding)
+        handle["backend"] = backend_name
+        handle["journal"] = ChangeJournal(norm_path, handle.get("index"))
+        handle["dedup"] = dedup
+        self._loaded_zips[norm_path] = handle
+        self._mount_refs[norm_path] = 1
+        self._mount_ids[norm_path] = next(self._next_mount_id)
+        self._touch(norm_path)
+        location = f"temp_dir={handle['temp_dir']}" if handle["temp_dir"] else "in memory"
+        print(f"     └─ ✅ mounted   backend={backend_name}   {location}")
+        return norm_path, self._mount_ids[norm_path], True
 
-    def unload_zip(self, *paths: str) -> None:
+    def unload_zip(self, *paths: str, force: bool = False) -> None:
         """
-        Unload one or more ZIP files, saving changes if mode is "rw".
+        Release one reference on each ZIP; a ZIP is unmounted (saving changes if
+        mode is "rw") once no reference is left. force=True unmounts immediately.
         """
         for path in paths:
             abs_path = Path(path).resolve()
@@ -49,14 +196,108 @@ class Z_Lib:
             
             if norm_path not in self._loaded_zips:
                 continue
+            if force:
+                self._unmount(norm_path)
+            else:
+                self._release(norm_path)
+        self._expire_idle()
+
+    def collect_idle(self) -> int:
+        """
+        Unmount unreferenced ZIPs that have been idle longer than idle_timeout.
+        Returns the number of ZIPs unmounted. Also runs on load_zip / unload_zip;
+        other calls (open, stat, resolve, ...) never unmount anything, and no
+        background timer exists, so call this periodically (e.g. from your own
+        scheduler) when a process keeps running without loading or unloading ZIPs.
+        """
+        self._next_idle_check = 0.0
+        return self._expire_idle()
 
-            handle = self._loaded_zips[norm_path]
-            will_save = handle.get("mode", "rw") == "rw"
-            save_label = "💾 saving" if will_save else "🚫 discarding"
-            print(f"  📦 [Z_Lib] UNLOAD  ◀  {save_label}   › {norm_path}")
-            self._backend.close(handle, save=True)
+    def _release(self, norm_path: str, mount_id: Optional[int] = None) -> None:
+        if norm_path not in self._loaded_zips:
+            return
+        if mount_id is not None and self._mount_ids.get(norm_path) != mount_id:
+            return  # 参照を取ったマウントは既にアンロード済み (同じパスの別のマウントには触れない)
+        refs = self._mount_refs[norm_path] = max(0, self._mount_refs.get(norm_path, 0) - 1)
+        if refs > 0:
+            print(f"  📦 [Z_Lib] RELEASE  ◀  refs={refs}   › {norm_path}")
+            return
+        if self._idle_timeout is None:
+            self._unmount(norm_path)
+            return
+        self._touch(norm_path)
+        print(f"  📦 [Z_Lib] RELEASE  ◀  idle — unmount after {self._idle_timeout}s   › {norm_path}")
+
+    def _unmount(self, norm_path: str, save: bool = True) -> None:
+        handle = self._loaded_zips[norm_path]
+        will_save = save and handle.get("mode", "rw") == "rw"
+        save_label = "💾 saving" if will_save else "🚫 discarding"
+        print(f"  📦 [Z_Lib] UNLOAD  ◀  {save_label}   › {norm_path}")
+        # 読み取り専用なら保存処理は不要。一時ディレクトリの削除はバックグラウンドで行われる
+        try:
+            self._backend_for(handle).close(handle, save=will_save)
+        finally:
+            # 保存に失敗しても一時ディレクトリは片付けられているので、マウントとしては外す
             del self._loaded_zips[norm_path]
-            print(f"     └─ ✅ closed")
+            self._mount_refs.pop(norm_path, None)
+            self._mount_ids.pop(norm_path, None)
+            self._last_used.pop(norm_path, None)
+        self._report_save_stats(handle)
+        print(f"     └─ ✅ closed")
+
+    def _unmount_unused(self, norm_path: str) -> None:
+        """Unmount for idle expiry / eviction. A failed save is logged, not raised into the unrelated caller."""
+        try:
+            self._unmount(norm_path)
+        except Exception as e:
+            print(f"     └─ ⚠️  save failed: {type(e).__name__}: {e}")
+
+    def _report_save_stats(self, handle: ZipHandle) -> None:
+        stats = handle.pop("save_stats", None)
+        if stats is None:
+            return
+        self.last_save_stats = stats
+        if stats["reused"]:
+            print(f"     └─ 📎 reused  {stats['reused']}/{stats['files']} unchanged member(s)   {stats['reused_bytes']} bytes copied as-is")
+        if handle.get("dedup"):
+            print(
+                f"     └─ ♊ dedup   {stats['duplicates']}/{stats['files']} duplicate(s)"
+                f"   ratio={stats['dedup_ratio']:.2f}x"
+                f"   saved≈{stats['cpu_saved_seconds']:.3f}s CPU   (hash {stats['hash_seconds']:.3f}s)"
+            )
+
+    def _touch(self, norm_path: str) -> None:
+        if norm_path in self._loaded_zips:
+            self._last_used[norm_path] = time.monotonic()
+            self._last_used.move_to_end(norm_path)
+
+    def _expire_idle(self) -> int:
+        if self._idle_timeout is None:
+            return 0
+        now = time.monotonic()
+        if now < self._next_idle_check:
+            return 0
+        self._next_idle_check = now + self._idle_timeout / 4
+        expired = [
+            key for key, last_used in self._last_used.items()
+            if self._mount_refs.get(key, 0) == 0 and now - last_used >= self._idle_timeout
+        ]
+        for key in expired:
+            print(f"  ⏳ [Z_Lib] IDLE  ▶  unused for {self._idle_timeout}s   › {key}")
+            self._unmount_unused(key)
+        return len(expired)
+
+    def _evict_for_new_mount(self) -> None:
+        """Make room for one more mount under max_mounted by unmounting LRU unreferenced ZIPs."""
+        if self._max_mounted is None:
+            return
+        while len(self._loaded_zips) >= self._max_mounted:
+            victim = next((key for key in self._last_used if self._mount_refs.get(key, 0) == 0), None)
+            if victim is None:
+                print(f"  ⚠️  [Z_Lib] LOAD  max_mounted={self._max_mounted} exceeded — all mounts are in use")
+                return
+            print(f"  ♻️  [Z_Lib] EVICT  ◀  least recently used   › {victim}")
+            self._unmount_unused(victim)
 
     def swap_zip(self, target_zips: List[str], create: bool = False, mode: OpenMode = "rw") -> None:
         """
@@ -77,7 +318,7 @@ class Z_Lib:
 
         # Unload
         if to_unload:
-            self.unload_zip(*to_unload)
+            self.unload_zip(*to_unload, force=True)
 
         # Load
         if to_load:
@@ -115,16 +356,314 @@ class Z_Lib:
         """
         Open a file (local or inside ZIP) seamlessly.
         """
-        real_path = resolve_to_real_path(path, self._loaded_zips)
-        print(f"  📂 [Z_Lib] OPEN   mode={mode!r}   › {path}")
-        return open(real_path, mode, **kwargs)
+        handle, internal_path = self._locate(path)
+        writing = handle is not None and any(c in mode for c in "wax+")
+        tree = handle.get("tree") if handle else None
+        if tree is not None and "+" not in mode:
+            print(f"  📂 [Z_Lib] OPEN   mode={mode!r}   (memory)   › {path}")
+            existed = tree.find(internal_path) >= 0
+            f = tree.open(internal_path, mode, path, **kwargs)
+        else:
+            real_path = self._real_path(path, handle, internal_path)
+            print(f"  📂 [Z_Lib] OPEN   mode={mode!r}   › {path}")
+            existed = writing and real_path.exists()
+            f = open(real_path, mode, **kwargs)
+        if writing:
+            self._record(handle, "modified" if existed else "created", internal_path)
+        return f
 
     def resolve(self, path: str) -> Path:
         """
         Resolve a virtual path to a real filesystem path (Path object).
         Useful for integration with libraries like Polars, Pillow, xlwings.
         """
-        return resolve_to_real_path(path, self._loaded_zips)
+        real_path, handle, _internal_path = self._resolve(path)
+        if handle is not None:
+            # 実パスを渡した以降の外部ライブラリによる書き込みは changes() の照合で検出する
+            handle["journal"].exposed = True
+        return real_path
+
+    def resolve_many(self, paths: Iterable[str]) -> List[Path]:
+        """
+        Resolve many virtual paths at once; returns real paths in the order of `paths`.
+        Meant for handing work to process pools: each distinct parent directory is
+        matched (and, for local paths, Path.resolve()d) once instead of once per file.
+        Unlike resolve(), the last component of a local path is not symlink-resolved.
+        """
+        paths = list(paths)
+        print(f"  🧭 [Z_Lib] RESOLVE_MANY   {len(paths)} path(s)")
+        return list(self._resolve_stream(paths))
+
+    def iter_resolve(self, paths: Iterable[str], chunk_size: int = 1024) -> Iterator[List[Path]]:
+        """
+        Lazy variant of resolve_many yielding lists of up to `chunk_size` real paths,
+        e.g. one list per executor.submit / executor.map chunk.
+        """
+        print(f"  🧭 [Z_Lib] ITER_RESOLVE   chunk_size={chunk_size}")
+        stream = self._resolve_stream(paths)
+        while True:
+            chunk = list(islice(stream, chunk_size))
+            if not chunk:
+                return
+            yield chunk
+
+    def changes(self, zip_key: str, since: int = 0, reconcile: bool = True) -> List[ChangeEvent]:
+        """
+        Changes made inside a loaded ZIP, oldest first.
+
+        Args:
+            zip_key: Path of a loaded ZIP.
+            since: Only return events with a sequence number (`seq`) greater than this.
+            reconcile: Also scan the temp dir for writes made through paths returned by
+                resolve() (only done once such a path has been handed out).
+        """
+        handle = self._root_handle(zip_key)
+        journal = handle["journal"]
+        if reconcile:
+            found = journal.reconcile(handle["temp_dir"] if handle.get("tree") is None else "")
+            if found:
+                print(f"  📝 [Z_Lib] CHANGES   reconcile found {len(found)} external change(s)   › {zip_key}")
+        return journal.since(since)
+
+    def subscribe(self, zip_key: str, callback: Callable[[ChangeEvent], None]) -> Callable[[], None]:
+        """
+        Call `callback(event)` for every change recorded in a loaded ZIP from now on
+        (external writes are reported when changes() reconciles).
+        Returns a function that cancels the subscription.
+        """
+        return self._root_handle(zip_key)["journal"].subscribe(callback)
+
+    def verify(self, path: str, workers: Optional[int] = None) -> VerifyReport:
+        """
+        Check the CRC32 and size of every member of a ZIP file without extracting it.
+
+        Args:
+            path: Path of the ZIP file on disk (it does not need to be loaded).
+            workers: If given, check members in parallel with this many threads.
+
+        Returns:
+            A VerifyReport; `bad` maps each corrupt member to the problem found.
+        """
+        import zipfile
+        from .backend.verify import verify_archive
+
+        print(f"  🩺 [Z_Lib] VERIFY   workers={workers}   › {normalize_path(path)}")
+        try:
+            report = verify_archive(path, workers=workers)
+        except zipfile.BadZipFile as e:
+            raise ZipPathError(f"File is not a valid ZIP file: {path} ({e})") from None
+        status = "✅ ok" if not report["bad"] else f"❌ {len(report['bad'])} bad"
+        print(f"     └─ {status}   checked={report['checked']}   skipped={len(report['skipped'])}")
+        return report
+
+    def export(
+        self,
+        zip_key: str,
+        dest: Union[str, "os.PathLike", BinaryIO],
+        compression: Optional[int] = None,
+        compresslevel: Optional[int] = None,
+    ) -> None:
+        """
+        Write the current state of a loaded ZIP to another file or a stream, in a
+        single streaming pass. The mount stays loaded and the original ZIP is untouched.
+
+        Args:
+            zip_key: Path of a loaded ZIP.
+            dest: Destination path, or a writable binary stream (socket file, pipe, ...).
+            compression, compresslevel: zipfile compression settings (default: as on save).
+        """
+        handle = self._root_handle(zip_key)
+        target = dest if isinstance(dest, (str, os.PathLike)) else type(dest).__name__
+        print(f"  📤 [Z_Lib] EXPORT   {zip_key}  ➜  {target}")
+        self._backend_for(handle).export(handle, dest, compression=compression, compresslevel=compresslevel)
+        self._report_save_stats(handle)
+
+    def read_many(self, paths: Iterable[str], workers: Optional[int] = None) -> List[bytes]:
+        """
+        Read the contents of many files (local or inside ZIPs) in one call.
+        Paths are resolved in one batch and read grouped by ZIP in member offset order.
+        Returns the contents in the order of `paths`.
+
+        Args:
+            paths: Virtual paths to read.
+            workers: If given, read with a thread pool of this size.
+        """
+        paths = list(paths)
+        results: List[bytes] = [b""] * len(paths)
+        for pos, _path, data in self._read_planned(paths, workers):
+            results[pos] = data
+        return results
+
+    def iter_read(self, paths: Iterable[str], workers: Optional[int] = None) -> Iterator[Tuple[str, bytes]]:
+        """
+        Iterator variant of read_many.
+        Lazily yields (path, content) in read order (grouped by ZIP, member offset order).
+        """
+        for _pos, path, data in self._read_planned(list(paths), workers):
+            yield path, data
+
+    def prefetch(self, paths: Iterable[str], depth: int = 8, workers: int = 1) -> "Prefetcher":
+        """
+        Iterate over files in a known order while reading upcoming ones in the background.
+        Yields (path, content) in the order of `paths`; at most `depth` files are buffered.
+        The returned Prefetcher exposes the buffer depth and consumer stall time.
+        """
+        return self._prefetcher(paths, depth, workers, wrap=None)
+
+    def open_sequence(self, paths: Iterable[str], depth: int = 8, workers: int = 1) -> "Prefetcher":
+        """
+        Like prefetch, but yields (path, binary file object) pairs, as if each file
+        had been opened with open(path, "rb").
+        """
+        return self._prefetcher(paths, depth, workers, wrap=io.BytesIO)
+
+    def _prefetcher(self, paths: Iterable[str], depth: int, workers: int, wrap: Optional[Callable[[bytes], IO]]) -> "Prefetcher":
+        from .prefetch import Prefetcher
+        matches = self._match_many(paths)
+        print(f"  ⏩ [Z_Lib] PREFETCH   {len(matches)} file(s)   depth={depth}   workers={workers}")
+        items = (
+            (path, lambda path=path, handle=handle, internal_path=internal_path: self._read_member(path, handle, internal_path))
+            for path, handle, internal_path in matches
+        )
+        return Prefetcher(items, depth=depth, workers=workers, wrap=wrap)
+
+    def _plan_reads(self, paths: List[str]) -> List[Tuple[int, str, Optional[ZipHandle], str]]:
+        """
+        Resolve `paths` in one batch and order them for sequential access:
+        ZIPs in order of first appearance, members sorted by local header offset,
+        local files last in input order.
+        """
+        groups: Dict[int, List[Tuple[int, str, Optional[ZipHandle], str]]] = {}
+        local: List[Tuple[int, str, Optional[ZipHandle], str]] = []
+        for pos, (path, handle, internal_path) in enumerate(self._match_many(paths)):
+            if handle is None:
+                local.append((pos, path, None, internal_path))
+            else:
+                groups.setdefault(id(handle), []).append((pos, path, handle, internal_path))
+
+        plan: List[Tuple[int, str, Optional[ZipHandle], str]] = []
+        for members in groups.values():
+            index = members[0][2].get("index")
+            if index is not None:
+                offsets = index.header_offsets
+                def offset_of(item, find=index.find):
+                    i = find(item[3])
+                    return offsets[i] if i >= 0 else math.inf
+                members.sort(key=offset_of)
+            plan.extend(members)
+        plan.extend(local)
+        return plan
+
+    def _read_planned(self, paths: List[str], workers: Optional[int]) -> Iterator[Tuple[int, str, bytes]]:
+        plan = self._plan_reads(paths)
+        archives = len({id(item[2]) for item in plan if item[2] is not None})
+        print(f"  📚 [Z_Lib] READ_MANY   {len(plan)} file(s)   archives={archives}   workers={workers}")
+
+        def read(item: Tuple[int, str, Optional[ZipHandle], str]) -> Tuple[int, str, bytes]:
+            pos, path, handle, internal_path = item
+            return pos, path, self._read_member(path, handle, internal_path)
+
+        yield from _ordered_map(read, plan, workers)
+
+    def _read_member(self, path: str, handle: Optional[ZipHandle], internal_path: str) -> bytes:
+        if handle is not None:
+            return self._backend_for(handle).read(handle, internal_path)
+        with open(self._real_path(path, handle, internal_path), "rb") as f:
+            return f.read()
+
+    def _locate(self, path: str) -> Tuple[Optional[ZipHandle], str]:
+        """
+        Find the loaded ZIP a virtual path belongs to.
+        Returns (handle, internal path), or (None, path) for local paths.
+        """
+        handle, internal_path = find_longest_match_handle(path, self._loaded_zips)
+        if handle is not None:
+            self._touch(normalize_path(handle["path"]))
+        return handle, internal_path
+
+    def _resolve_stream(self, paths: Iterable[str]) -> Iterator[Path]:
+        mount_dirs: Dict[int, Path] = {}
+        local_parents: Dict[str, Path] = {}
+        for path, handle, internal_path in match_many(paths, self._loaded_zips):
+            if handle is None:
+                yield _resolve_local(path, local_parents)
+                continue
+            mount_dir = mount_dirs.get(id(handle))
+            if mount_dir is None:
+                # マウントごとに1回だけ: メモリ上なら書き出し、外部書き込みの照合対象にする
+                mount_dir = mount_dirs[id(handle)] = Path(self._mount_dir(handle))
+                handle["journal"].exposed = True
+                self._touch(normalize_path(handle["path"]))
+            yield mount_dir / internal_path
+
+    def _root_handle(self, zip_key: str) -> ZipHandle:
+        """Handle of the loaded ZIP whose root is `zip_key`; raises ZipNotLoadedError otherwise."""
+        handle, internal_path = self._locate(zip_key)
+        if handle is None or internal_path.strip("/"):
+            raise ZipNotLoadedError(f"ZIP file '{zip_key}' is not loaded.")
+        return handle
+
+    def _resolve(self, path: str) -> Tuple[Path, Optional[ZipHandle], str]:
+        """resolve() for internal callers that record their own changes: (real path, handle, internal path)."""
+        handle, internal_path = self._locate(path)
+        return self._real_path(path, handle, internal_path), handle, internal_path
+
+    def _record(self, handle: Optional[ZipHandle], kind: ChangeKind, internal_path: str, dest: Optional[str] = None) -> None:
+        if handle is not None:
+            handle["journal"].record(kind, internal_path, dest)
+
+    def _record_transfer(
+        self,
+        src: Tuple[Optional[ZipHandle], str],
+        dst: Tuple[Optional[ZipHandle], str],
+        move: bool,
+        dst_existed: bool = False,
+    ) -> None:
+        """Record a copy or move between two (handle, internal path) locations."""
+        (src_handle, src_internal), (dst_handle, dst_internal) = src, dst
+        if move and src_handle is not None and src_handle is dst_handle:
+            self._record(src_handle, "moved", src_internal, dst_internal)
+            return
+        if move:
+            self._record(src_handle, "deleted", src_internal)
+        self._record(dst_handle, "modified" if dst_existed else "created", dst_internal)
+
+    def _match_many(self, paths: Iterable[str]) -> List[Tuple[str, Optional[ZipHandle], str]]:
+        """Batched _locate: resolves all paths at once and touches each matched ZIP once."""
+        matches = list(match_many(paths, self._loaded_zips))
+        for handle in {id(h): h for _p, h, _i in matches if h is not None}.values():
+            self._touch(normalize_path(handle["path"]))
+        return matches
+
+    def _real_path(self, path: str, handle: Optional[ZipHandle], internal_path: str) -> Path:
+        """Real filesystem path for a (handle, internal path) pair returned by _locate."""
+        if handle is not None:
+            self._mount_dir(handle)
+        return resolve_match(path, handle, internal_path)
+
+    def _mount_dir(self, handle: ZipHandle) -> str:
+        """Directory holding the mount's files; in-memory mounts are written to disk first."""
+        if handle.get("tree") is not None:
+            print(f"  💧 [Z_Lib] SPILL  memory ➜ disk   › {handle['path']}")
+        return self._backend_for(handle).materialize(handle)
+
+    def _choose_backend(self, abs_path: Path, backend: Optional[str]) -> str:
+        if backend is not None:
+            return backend
+        if self._memory_threshold is not None and abs_path.is_file():
+            if abs_path.stat().st_size <= self._memory_threshold:
+                return "memory"
+        return self._default_backend
+
+    def _backend_named(self, name: str) -> "ZipBackend":
+        backend = self._backends.get(name)
+        if backend is None:
+            from .backend.registry import create_backend
+            backend = self._backends[name] = create_backend(name, **self._backend_options)
+        return backend
+
+    def _backend_for(self, handle: ZipHandle) -> "ZipBackend":
+        return self._backend_named(handle.get("backend", "zipfile"))
 
     def _cleanup(self) -> None:
         """
@@ -134,8 +673,103 @@ class Z_Lib:
         if remaining:
             print(f"  🧹 [Z_Lib] CLEANUP  ▶  unloading {len(remaining)} ZIP(s) ...")
             for zip_path in remaining:
-                self.unload_zip(zip_path)
+                self.unload_zip(zip_path, force=True)
             print(f"     └─ ✅ all ZIPs closed")
 
     def __del__(self) -> None:
         self._cleanup()
+
+
+def _resolve_local(path: str, parents: Dict[str, Path]) -> Path:
+    """resolve_match for a local path, resolving each parent directory only once."""
+    parent, sep, name = normalize_path(path).rpartition("/")
+    if not sep or name in ("", ".", "..") or name.lower().endswith(".zip"):
+        return resolve_match(path, None, path)
+    base = parents.get(parent)
+    if base is None:
+        if split_zip_path(parent)[0] is not None:
+            resolve_match(path, None, path)  # ZipNotLoadedError
+        base = parents[parent] = Path(f"{parent}/").resolve()
+    return base / name
+
+
+def _shared_mismatches(
+    handle: ZipHandle,
+    mode: OpenMode,
+    encoding: Optional[str],
+    backend: Optional[str],
+    dedup: bool,
+) -> List[str]:
+    """Options of a load_zip call that differ from the mount it shares ("name=requested (kept)")."""
+    mismatches = []
+    if mode != handle["mode"]:
+        mismatches.append(f"mode={mode!r} (kept {handle['mode']!r})")
+    if encoding is not None and _codec_name(encoding) != _codec_name(handle.get("encoding")):
+        mismatches.append(f"encoding={encoding!r} (kept {handle.get('encoding')!r})")
+    if backend is not None and backend != handle.get("backend"):
+        mismatches.append(f"backend={backend!r} (kept {handle.get('backend')!r})")
+    if dedup != bool(handle.get("dedup")):
+        mismatches.append(f"dedup={dedup!r} (kept {bool(handle.get('dedup'))!r})")
+    return mismatches
+
+
+def _codec_name(encoding: Optional[str]) -> Optional[str]:
+    if encoding is None:
+        return None
+    try:
+        return codecs.lookup(encoding).name
+    except LookupError:
+        return encoding
+
+
+_instances: "weakref.WeakSet[Z_Lib]" = weakref.WeakSet()
+_atexit_registered = False
+
+
+def _track_instance(z_lib: Z_Lib) -> None:
+    """
+    Add an instance to the process-wide cleanup registry. A single atexit hook
+    unloads the mounts of every instance still alive at exit; the registry holds
+    weak references, so it does not keep dropped instances alive.
+    """
+    global _atexit_registered
+    _instances.add(z_lib)
+    if not _atexit_registered:
+        atexit.register(_cleanup_all)
+        _atexit_registered = True
+
+
+def _cleanup_all() -> None:
+    for z_lib in list(_instances):
+        z_lib._cleanup()
+    # リーパーはデーモンスレッドなので、ここで待たないと削除待ちの一時ディレクトリが残る
+    from .reaper import drain_at_exit
+    drain_at_exit()
+
+
+def _ordered_map(fn: Callable[[_T], _R], items: List[_T], workers: Optional[int]) -> Iterator[_R]:
+    """
+    map(fn, items) that keeps at most a few tasks per worker in flight, so lazily
+    consumed results never pile up in memory. Runs inline when workers is falsy.
+    """
+    if not workers:
+        for item in items:
+            yield fn(item)
+        return
+
+    from concurrent.futures import ThreadPoolExecutor
+
+    window = workers * 4
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="z_lib_read") as executor:
+        pending = deque()
+        it = iter(items)
+        for item in it:
+            pending.append(executor.submit(fn, item))
+            if len(pending) >= window:
+                break
+        while pending:
+            result = pending.popleft().result()
+            for item in it:
+                pending.append(executor.submit(fn, item))
+                break
+            yield result
@@ -9,3 +9,7 @@ class ZipAlreadyLoadedError(Exception):
 class ZipPathError(Exception):
     """Raised when a path is invalid or cannot be resolved to a ZIP file."""
     pass
+
+class ZipIntegrityError(ZipPathError):
+    """Raised when a ZIP file fails integrity verification (bad CRC or size)."""
+    pass
@@ -0,0 +1,147 @@
+import os
+import threading
+from typing import Callable, Dict, List, Optional, Set, Tuple, TYPE_CHECKING
+from ._types import ChangeEvent, ChangeKind, ChangeSource
+
+if TYPE_CHECKING:
+    from .backend.zip_index import ZipIndex
+
+ChangeCallback = Callable[[ChangeEvent], None]
+
+
+class ChangeJournal:
+    """
+    Ordered record of the changes made inside one mount.
+
+    Z_Lib entry points (open for writing, Z_OS, Z_Shutil) record into it directly.
+    Writes made by other libraries through paths obtained from `resolve()` are picked
+    up by `reconcile`, which compares the temp dir with the last known state
+    (initially the archive index: extraction stamps files with the member mtime).
+    Paths are stored relative to the archive root; events carry virtual paths.
+    """
+
+    def __init__(self, root: str, index: Optional["ZipIndex"] = None) -> None:
+        self.root = root
+        self.events: List[ChangeEvent] = []
+        self.exposed = False  # resolve() が実パスを渡した後は外部からの書き込みがあり得る
+        self._index = index
+        self._snapshot: Optional[Dict[str, Tuple[int, int]]] = None
+        self._touched: Set[str] = set()
+        self._subscribers: List[ChangeCallback] = []
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self.events)
+
+    def record(
+        self,
+        kind: ChangeKind,
+        internal: str,
+        dest: Optional[str] = None,
+        source: ChangeSource = "api",
+    ) -> ChangeEvent:
+        internal = internal.strip("/")
+        dest = dest.strip("/") if dest is not None else None
+        with self._lock:
+            event = ChangeEvent(
+                seq=len(self.events) + 1,
+                kind=kind,
+                path=self._virtual(internal),
+                dest=self._virtual(dest) if dest is not None else None,
+                source=source,
+                internal=internal,
+                internal_dest=dest,
+            )
+            self.events.append(event)
+            if source == "api":
+                self._touched.add(internal)
+                if dest is not None:
+                    self._touched.add(dest)
+            subscribers = list(self._subscribers)
+        for callback in subscribers:
+            callback(event)
+        return event
+
+    def since(self, seq: int = 0) -> List[ChangeEvent]:
+        """Events with a sequence number greater than `seq`, oldest first."""
+        with self._lock:
+            return self.events[seq:]
+
+    def subscribe(self, callback: ChangeCallback) -> Callable[[], None]:
+        """Call `callback(event)` for every new event. Returns a function that unsubscribes."""
+        with self._lock:
+            self._subscribers.append(callback)
+
+        def unsubscribe() -> None:
+            with self._lock:
+                if callback in self._subscribers:
+                    self._subscribers.remove(callback)
+        return unsubscribe
+
+    def reconcile(self, temp_dir: str) -> List[ChangeEvent]:
+        """
+        Record changes made directly in `temp_dir` since the last reconcile.
+        Does nothing until the mount's real paths have been handed out (`exposed`).
+        Paths already recorded through the API since then are not reported twice.
+        """
+        if not self.exposed or not temp_dir:
+            return []
+        previous = self._snapshot if self._snapshot is not None else self._baseline()
+        current = _scan(temp_dir)
+        with self._lock:
+            touched, self._touched = self._touched, set()
+
+        def known(name: str) -> bool:
+            # API で記録済みのパス (またはその親ディレクトリ) は二重に報告しない
+            while True:
+                if name in touched:
+                    return True
+                name, sep, _ = name.rpartition("/")
+                if not sep:
+                    return False
+
+        new_events: List[ChangeEvent] = []
+        for name, signature in current.items():
+            old = previous.get(name)
+            if old == signature or known(name):
+                continue
+            new_events.append(self.record("created" if old is None else "modified", name, source="scan"))
+        for name in previous.keys() - current.keys():
+            if not known(name):
+                new_events.append(self.record("deleted", name, source="scan"))
+        self._snapshot = current
+        return new_events
+
+    def _baseline(self) -> Dict[str, Tuple[int, int]]:
+        index = self._index
+        if index is None:
+            return {}
+        return {
+            name: (index.file_sizes[i], round(index.mtime(i) * 1e9))
+            for i, name in enumerate(index.names)
+            if not name.endswith("/")
+        }
+
+    def _virtual(self, internal: str) -> str:
+        return f"{self.root}/{internal}" if internal else self.root
+
+
+def _scan(temp_dir: str) -> Dict[str, Tuple[int, int]]:
+    """ファイルごとの (サイズ, 更新時刻 ns) を集める。"""
+    result: Dict[str, Tuple[int, int]] = {}
+    stack = [("", temp_dir)]
+    while stack:
+        prefix, directory = stack.pop()
+        try:
+            entries = os.scandir(directory)
+        except OSError:
+            continue
+        with entries:
+            for entry in entries:
+                name = f"{prefix}{entry.name}"
+                if entry.is_dir(follow_symlinks=False):
+                    stack.append((name + "/", entry.path))
+                    continue
+                st = entry.stat(follow_symlinks=False)
+                result[name] = (st.st_size, st.st_mtime_ns)
+    return result
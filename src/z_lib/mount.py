@@ -0,0 +1,44 @@
+from typing import Any, List, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from .core import Z_Lib
+
+class ZipMount:
+    """
+    Reference to one or more ZIP files mounted by Z_Lib.load_zip.
+
+    Each load_zip call takes one reference per ZIP; a ZIP stays mounted while any
+    reference is held. Release it explicitly or use it as a context manager:
+
+        with z.load_zip("data.zip", mode="r"):
+            ...
+    """
+
+    def __init__(self, z_lib: "Z_Lib", keys: List[str], mount_ids: List[int]):
+        self._z_lib = z_lib
+        self.keys = keys
+        # 参照を取ったマウントの世代。アンロード後に再マウントされた同じパスには影響しない
+        self._mount_ids = mount_ids
+        self._released = False
+
+    @property
+    def released(self) -> bool:
+        return self._released
+
+    def release(self) -> None:
+        """Drop this reference. Releasing twice is a no-op."""
+        if self._released:
+            return
+        self._released = True
+        for key, mount_id in zip(self.keys, self._mount_ids):
+            self._z_lib._release(key, mount_id)
+
+    def __enter__(self) -> "ZipMount":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.release()
+
+    def __repr__(self) -> str:
+        state = "released" if self._released else "held"
+        return f"<ZipMount {state} {self.keys!r}>"
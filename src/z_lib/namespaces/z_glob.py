@@ -0,0 +1,191 @@
+import os
+import re
+import fnmatch
+from typing import Iterator, List, Optional, Tuple, Union, TYPE_CHECKING
+from ..path_resolver import normalize_path, find_longest_match_handle
+from .._types import ZipHandle
+from ..backend.zip_index import mounted_index
+
+if TYPE_CHECKING:
+    from ..core import Z_Lib
+    from ..backend.zip_index import ZipIndex
+
+_MAGIC = re.compile(r"[*?[]")
+
+# 走査ノード: ("fs", 実ディレクトリパス) または ("index", ZipIndex, ZIP内部パス)
+_Node = Union[Tuple[str, str], Tuple[str, "ZipIndex", str]]
+
+
+def has_magic(s: str) -> bool:
+    return _MAGIC.search(s) is not None
+
+
+class Z_Glob:
+    """
+    Z_Lib.glob として公開される、標準の glob モジュール相当の名前空間。
+    ローカルフォルダとロード済みZIPをまたいでパターンに一致する仮想パスを返す。
+    読み取り専用 (mode="r") でロードされたZIPは一時ディレクトリではなく
+    中央ディレクトリのインデックスから直接列挙する。
+    """
+
+    def __init__(self, z_lib: "Z_Lib"):
+        self._z_lib = z_lib
+
+    def __call__(self, pattern: str, recursive: bool = True) -> Iterator[str]:
+        """Shorthand for `iglob(pattern, recursive=True)`: `z.glob("data/**/*.csv")`."""
+        return self.iglob(pattern, recursive=recursive)
+
+    def glob(self, pattern: str, recursive: bool = False) -> List[str]:
+        return list(self.iglob(pattern, recursive=recursive))
+
+    def iglob(self, pattern: str, recursive: bool = False) -> Iterator[str]:
+        """
+        Lazily yield virtual paths matching `pattern`.
+        With recursive=True, "**" matches any files and zero or more directories.
+        """
+        print(f"  🔎 [Z_GLOB] iglob   recursive={recursive}   › {pattern}")
+        pattern = normalize_path(pattern)
+        dirs_only = pattern.endswith("/") and pattern.strip("/") != ""
+        parts = pattern.rstrip("/").split("/") if dirs_only else pattern.split("/")
+
+        first_magic = next((i for i, part in enumerate(parts) if has_magic(part)), None)
+        if first_magic is None:
+            if self._z_lib.os.path.exists(pattern):
+                yield pattern
+            return
+
+        base = "/".join(parts[:first_magic])
+        if pattern.startswith("/") and not base:
+            base = "/"
+        elif base.endswith(":"):
+            base += "/"
+
+        node = self._node_for(base)
+        if node is None:
+            return
+        for path, is_dir in self._match(node, base, parts[first_magic:], recursive):
+            if dirs_only:
+                if is_dir:
+                    yield path if path.endswith("/") else path + "/"
+            else:
+                yield path
+
+    # ------------------------------------------------------------------
+    # 内部実装
+    # ------------------------------------------------------------------
+
+    def _node_for(self, base: str) -> Optional[_Node]:
+        """Map the literal prefix of a pattern to the node to start scanning from."""
+        if not base:
+            return ("fs", ".")
+        handle, internal_path = find_longest_match_handle(base, self._z_lib._loaded_zips)
+        if handle is None:
+            return ("fs", base) if os.path.isdir(base) else None
+        node = self._mount_node(handle, internal_path)
+        if node[0] == "index" and node[1].children(internal_path) is None:
+            return None
+        if node[0] == "fs" and not os.path.isdir(node[1]):
+            return None
+        return node
+
+    def _mount_node(self, handle: ZipHandle, internal_path: str = "") -> _Node:
+        index = mounted_index(handle)
+        if index is not None:
+            return ("index", index, internal_path.strip("/"))
+        return ("fs", os.path.join(handle["temp_dir"], internal_path) if internal_path else handle["temp_dir"])
+
+    def _scan(self, node: _Node) -> Iterator[Tuple[str, bool, Optional[_Node]]]:
+        """Yield (name, is_dir, child node or None) for the direct children of `node`."""
+        if node[0] == "index":
+            _, index, internal = node
+            children = index.children(internal) or {}
+            for name, pos in children.items():
+                if index.child_is_dir(pos):
+                    child = f"{internal}/{name}" if internal else name
+                    yield name, True, ("index", index, child)
+                else:
+                    yield name, False, None
+            return
+
+        loaded_zips = self._z_lib._loaded_zips
+        try:
+            entries = os.scandir(node[1])
+        except OSError:
+            return
+        with entries:
+            for entry in entries:
+                try:
+                    is_dir = entry.is_dir()
+                except OSError:
+                    is_dir = False
+                if is_dir:
+                    yield entry.name, True, ("fs", entry.path)
+                    continue
+                # ロード済みZIPはディレクトリとして扱う
+                if entry.name.lower().endswith(".zip"):
+                    handle = loaded_zips.get(normalize_path(os.path.realpath(entry.path)))
+                    if handle is not None:
+                        yield entry.name, True, self._mount_node(handle)
+                        continue
+                yield entry.name, False, None
+
+    def _walk_dirs(self, node: _Node, prefix: str) -> Iterator[Tuple[str, _Node]]:
+        """Yield `node` and every non-hidden directory below it, depth first."""
+        yield prefix, node
+        for name, is_dir, child in self._scan(node):
+            if is_dir and not _is_hidden(name):
+                yield from self._walk_dirs(child, _join(prefix, name))
+
+    def _walk_all(self, node: _Node, prefix: str) -> Iterator[Tuple[str, bool]]:
+        """Yield every non-hidden file and directory below `node`, depth first."""
+        for name, is_dir, child in self._scan(node):
+            if _is_hidden(name):
+                continue
+            path = _join(prefix, name)
+            yield path, is_dir
+            if is_dir:
+                yield from self._walk_all(child, path)
+
+    def _match(self, node: _Node, prefix: str, parts: List[str], recursive: bool) -> Iterator[Tuple[str, bool]]:
+        head, rest = parts[0], parts[1:]
+
+        if recursive and head == "**":
+            if not rest:
+                # 末尾の "**" は標準の glob と同じく、起点のディレクトリ自身 ("dir/") と配下すべてに一致する
+                if prefix:
+                    yield _join(prefix, ""), True
+                yield from self._walk_all(node, prefix)
+                return
+            for dir_prefix, dir_node in self._walk_dirs(node, prefix):
+                yield from self._match(dir_node, dir_prefix, rest, recursive)
+            return
+
+        if has_magic(head):
+            matcher = re.compile(fnmatch.translate(head)).match
+            # 標準の glob と同じく、"." で始まる名前はパターン側も "." で始まるときだけ一致させる
+            skip_hidden = not _is_hidden(head)
+        else:
+            matcher = head.__eq__
+            skip_hidden = False
+        for name, is_dir, child in self._scan(node):
+            if skip_hidden and _is_hidden(name):
+                continue
+            if not matcher(name):
+                continue
+            path = _join(prefix, name)
+            if not rest:
+                yield path, is_dir
+            elif is_dir:
+                yield from self._match(child, path, rest, recursive)
+
+
+def _is_hidden(name: str) -> bool:
+    return name.startswith(".")
+
+
+def _join(prefix: str, name: str) -> str:
+    if not prefix:
+        return name
+    if prefix.endswith("/"):
+        return prefix + name
+    return f"{prefix}/{name}"
@@ -1,49 +1,195 @@
+import errno
 import os
-from typing import Any, Iterator, List, Tuple, TYPE_CHECKING
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple, TYPE_CHECKING
 from pathlib import Path
 from ..path_resolver import normalize_path
+from .._types import ZipHandle
+from ..backend.zip_index import ZipIndex, mounted_index
+from ..backend.memory_backend import memory_tree
 from .z_os_path import Z_OS_Path
 
 if TYPE_CHECKING:
     from ..core import Z_Lib
 
+class Z_DirEntry:
+    """
+    os.DirEntry 相当のエントリ。path は実パスではなく仮想パスを保持する。
+    ZIP内のエントリは stat 情報をZIPのメタデータから、ローカルのエントリは
+    os.scandir のキャッシュから返す。
+    """
+    __slots__ = ("name", "path", "_entry", "_is_dir", "_stat", "_stat_fn")
+
+    def __init__(
+        self,
+        name: str,
+        path: str,
+        entry: Optional[os.DirEntry] = None,
+        is_dir: Optional[bool] = None,
+        stat_fn: Optional[Callable[[], os.stat_result]] = None,
+    ):
+        self.name = name
+        self.path = path
+        self._entry = entry
+        self._is_dir = is_dir
+        self._stat: Optional[os.stat_result] = None
+        self._stat_fn = stat_fn
+
+    def is_dir(self, *, follow_symlinks: bool = True) -> bool:
+        if self._is_dir is not None:
+            return self._is_dir
+        return self._entry.is_dir(follow_symlinks=follow_symlinks)
+
+    def is_file(self, *, follow_symlinks: bool = True) -> bool:
+        if self._is_dir is not None:
+            return not self._is_dir
+        return self._entry.is_file(follow_symlinks=follow_symlinks)
+
+    def is_symlink(self) -> bool:
+        return self._entry.is_symlink() if self._entry is not None else False
+
+    def stat(self, *, follow_symlinks: bool = True) -> os.stat_result:
+        if self._stat_fn is not None:
+            if self._stat is None:
+                self._stat = self._stat_fn()
+            return self._stat
+        return self._entry.stat(follow_symlinks=follow_symlinks)
+
+    def __repr__(self) -> str:
+        return f"<Z_DirEntry {self.name!r}>"
+
+
+class _ScandirIterator:
+    """Iterator returned by Z_OS.scandir; usable as a context manager like os.scandir."""
+
+    def __init__(self, entries: Iterator[Z_DirEntry], close: Optional[Callable[[], None]] = None):
+        self._entries = entries
+        self._close = close
+
+    def __iter__(self) -> "_ScandirIterator":
+        return self
+
+    def __next__(self) -> Z_DirEntry:
+        return next(self._entries)
+
+    def close(self) -> None:
+        if self._close is not None:
+            self._close()
+
+    def __enter__(self) -> "_ScandirIterator":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+
 class Z_OS:
     def __init__(self, z_lib: "Z_Lib"):
         self._z_lib = z_lib
         self.path = Z_OS_Path(z_lib)
 
     def listdir(self, path: str) -> List[str]:
-        real_path = self._z_lib.resolve(path)
+        handle, internal_path = self._z_lib._locate(path)
         print(f"  📁 [Z_OS] listdir   › {path}")
-        result = os.listdir(real_path)
+        tree = memory_tree(handle) if handle else None
+        if tree is not None:
+            children = tree.children(internal_path)
+            if children is None:
+                _raise_missing(tree, internal_path, path)
+            result = list(children)
+        else:
+            result = os.listdir(self._z_lib._real_path(path, handle, internal_path))
         print(f"     └─ {len(result)} entries")
         return result
 
+    def scandir(self, path: str = ".") -> _ScandirIterator:
+        """
+        os.scandir 相当。Z_DirEntry のイテレータを返す。
+        読み取り専用でロードされたZIP内はインデックスから一括で列挙し、
+        サイズ・更新時刻・ディレクトリ判定をZIPのメタデータで埋める。
+        """
+        handle, internal_path = self._z_lib._locate(path)
+        print(f"  📁 [Z_OS] scandir   › {path}")
+        prefix = normalize_path(path).rstrip("/") or "/"
+
+        index = mounted_index(handle) if handle else None
+        if index is not None:
+            children = index.children(internal_path)
+            if children is None:
+                _raise_missing(index, internal_path, path)
+            return _ScandirIterator(self._index_entries(index, children, prefix))
+
+        real_path = self._z_lib._real_path(path, handle, internal_path)
+        it = os.scandir(real_path)
+        return _ScandirIterator(self._fs_entries(it, prefix), it.close)
+
+    def stat(self, path: str, *, follow_symlinks: bool = True) -> os.stat_result:
+        """
+        os.stat 相当。読み取り専用でロードされたZIP内のパスは
+        一時ファイルに触れずにZIPのメタデータから stat_result を組み立てる。
+        """
+        handle, internal_path = self._z_lib._locate(path)
+        index = mounted_index(handle) if handle else None
+        if index is not None:
+            internal_path = internal_path.strip("/")
+            pos = index.find(internal_path) if internal_path else -1
+            if pos < 0 and index.children(internal_path) is None:
+                _raise_missing(index, internal_path, path)
+            return index.stat(pos)
+        return os.stat(self._z_lib._real_path(path, handle, internal_path), follow_symlinks=follow_symlinks)
+
+    def _index_entries(self, index: ZipIndex, children: Dict[str, int], prefix: str) -> Iterator[Z_DirEntry]:
+        for name, pos in children.items():
+            yield Z_DirEntry(
+                name,
+                _join(prefix, name),
+                is_dir=index.child_is_dir(pos),
+                stat_fn=lambda pos=pos: index.stat(pos),
+            )
+
+    def _fs_entries(self, it: Iterator[os.DirEntry], prefix: str) -> Iterator[Z_DirEntry]:
+        loaded_zips = self._z_lib._loaded_zips
+        for entry in it:
+            virtual = _join(prefix, entry.name)
+            # ロード済みZIPはディレクトリとして扱う (walk と同じ挙動)
+            if entry.name.lower().endswith(".zip") and not entry.is_dir():
+                handle = loaded_zips.get(normalize_path(os.path.realpath(entry.path)))
+                if handle is not None:
+                    yield Z_DirEntry(entry.name, virtual, is_dir=True, stat_fn=lambda h=handle: _mount_root_stat(h))
+                    continue
+            yield Z_DirEntry(entry.name, virtual, entry=entry)
+
     def mkdir(self, path: str, mode: int = 0o777) -> None:
-        real_path = self._z_lib.resolve(path)
+        real_path, handle, internal_path = self._z_lib._resolve(path)
         print(f"  📂 [Z_OS] mkdir   › {path}")
         os.mkdir(real_path, mode)
+        self._z_lib._record(handle, "created", internal_path)
         
     def makedirs(self, path: str, mode: int = 0o777, exist_ok: bool = False) -> None:
-        real_path = self._z_lib.resolve(path)
+        real_path, handle, internal_path = self._z_lib._resolve(path)
         print(f"  📂 [Z_OS] makedirs   exist_ok={exist_ok}   › {path}")
+        existed = real_path.is_dir()
         os.makedirs(real_path, mode, exist_ok)
+        if not existed:
+            self._z_lib._record(handle, "created", internal_path)
 
     def remove(self, path: str) -> None:
-        real_path = self._z_lib.resolve(path)
+        real_path, handle, internal_path = self._z_lib._resolve(path)
         print(f"  🗑  [Z_OS] remove   › {path}")
         os.remove(real_path)
+        self._z_lib._record(handle, "deleted", internal_path)
         
     def rmdir(self, path: str) -> None:
-        real_path = self._z_lib.resolve(path)
+        real_path, handle, internal_path = self._z_lib._resolve(path)
         print(f"  🗑  [Z_OS] rmdir   › {path}")
         os.rmdir(real_path)
+        self._z_lib._record(handle, "deleted", internal_path)
 
     def rename(self, src: str, dst: str) -> None:
-        real_src = self._z_lib.resolve(src)
-        real_dst = self._z_lib.resolve(dst)
+        real_src, src_handle, src_internal = self._z_lib._resolve(src)
+        real_dst, dst_handle, dst_internal = self._z_lib._resolve(dst)
         print(f"  ✏️  [Z_OS] rename   {src} → {dst}")
         os.rename(real_src, real_dst)
+        self._z_lib._record_transfer((src_handle, src_internal), (dst_handle, dst_internal), move=True)
 
     def walk(self, top: str, topdown: bool = True, onerror: Any = None, followlinks: bool = False) -> Iterator[Tuple[str, List[str], List[str]]]:
         """
@@ -72,7 +218,8 @@ class Z_OS:
 
         if handle:
             # ZIPの一時ディレクトリを起点にローカルwalkし、仮想パスに変換して yield
-            real_top = Path(handle["temp_dir"]) / internal_path
+            # (メモリ上のマウントはここで一時ディレクトリへ書き出される)
+            real_top = Path(self._z_lib._mount_dir(handle)) / internal_path
             for root, dirs, files in os.walk(real_top, topdown=topdown, onerror=onerror, followlinks=followlinks):
                 try:
                     rel = Path(root).relative_to(Path(handle["temp_dir"]))
@@ -141,3 +288,20 @@ class Z_OS:
 
         if not topdown:
             yield virtual_top, virtual_dirs, sub_files
+
+
+def _join(prefix: str, name: str) -> str:
+    return prefix + name if prefix.endswith("/") else f"{prefix}/{name}"
+
+
+def _mount_root_stat(handle: ZipHandle) -> os.stat_result:
+    index = mounted_index(handle)
+    if index is not None:
+        return index.stat(-1)
+    return os.stat(handle["temp_dir"])
+
+
+def _raise_missing(index: ZipIndex, internal_path: str, path: str) -> None:
+    if internal_path and index.find(internal_path) >= 0:
+        raise NotADirectoryError(errno.ENOTDIR, os.strerror(errno.ENOTDIR), path)
+    raise FileNotFoundError(errno.ENOENT, os.strerror(errno.ENOENT), path)
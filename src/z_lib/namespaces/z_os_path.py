@@ -1,4 +1,5 @@
 import os
+import stat
 from typing import Any, TYPE_CHECKING
 from ..path_resolver import normalize_path
 
@@ -11,22 +12,20 @@ class Z_OS_Path:
 
     def exists(self, path: str) -> bool:
         try:
-            real_path = self._z_lib.resolve(path)
-            return real_path.exists()
+            self._z_lib.os.stat(path)
+            return True
         except Exception:
             return False
 
     def isfile(self, path: str) -> bool:
         try:
-            real_path = self._z_lib.resolve(path)
-            return real_path.is_file()
+            return stat.S_ISREG(self._z_lib.os.stat(path).st_mode)
         except Exception:
             return False
 
     def isdir(self, path: str) -> bool:
         try:
-            real_path = self._z_lib.resolve(path)
-            return real_path.is_dir()
+            return stat.S_ISDIR(self._z_lib.os.stat(path).st_mode)
         except Exception:
             return False
 
@@ -58,5 +57,7 @@ class Z_OS_Path:
         return os.path.splitext(normalize_path(path))
         
     def getsize(self, path: str) -> int:
-        real_path = self._z_lib.resolve(path)
-        return os.path.getsize(real_path)
+        return self._z_lib.os.stat(path).st_size
+
+    def getmtime(self, path: str) -> float:
+        return self._z_lib.os.stat(path).st_mtime
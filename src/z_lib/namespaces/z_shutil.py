@@ -1,5 +1,8 @@
+import os
 import shutil
-from typing import TYPE_CHECKING
+from pathlib import Path
+from typing import Optional, Tuple, TYPE_CHECKING
+from .._types import ZipHandle
 if TYPE_CHECKING:
     from ..core import Z_Lib
 
@@ -8,25 +11,54 @@ class Z_Shutil:
         self._z_lib = z_lib
 
     def copy2(self, src: str, dst: str, **kwargs) -> str:
-        real_src = self._z_lib.resolve(src)
-        real_dst = self._z_lib.resolve(dst)
+        real_src, src_handle, src_internal = self._z_lib._resolve(src)
+        real_dst, dst_handle, dst_internal = self._z_lib._resolve(dst)
         print(f"  📌 [Z_SHUTIL] copy2   {src}  ➜  {dst}")
+        target = real_dst / real_src.name if real_dst.is_dir() else real_dst
+        existed = target.exists()
         real_dst_result = shutil.copy2(real_src, real_dst, **kwargs)
+        self._z_lib._record_transfer(
+            (src_handle, src_internal),
+            _destination(dst_handle, dst_internal, real_dst, real_dst_result),
+            move=False,
+            dst_existed=existed,
+        )
         return str(real_dst_result)
 
     def move(self, src: str, dst: str, **kwargs) -> str:
-        real_src = self._z_lib.resolve(src)
-        real_dst = self._z_lib.resolve(dst)
+        real_src, src_handle, src_internal = self._z_lib._resolve(src)
+        real_dst, dst_handle, dst_internal = self._z_lib._resolve(dst)
         print(f"  ➡️  [Z_SHUTIL] move   {src}  ➜  {dst}")
-        return str(shutil.move(real_src, real_dst, **kwargs))
+        result = shutil.move(real_src, real_dst, **kwargs)
+        self._z_lib._record_transfer(
+            (src_handle, src_internal),
+            _destination(dst_handle, dst_internal, real_dst, result),
+            move=True,
+        )
+        return str(result)
         
     def copytree(self, src: str, dst: str, **kwargs) -> str:
-        real_src = self._z_lib.resolve(src)
-        real_dst = self._z_lib.resolve(dst)
+        real_src, src_handle, src_internal = self._z_lib._resolve(src)
+        real_dst, dst_handle, dst_internal = self._z_lib._resolve(dst)
         print(f"  🗂  [Z_SHUTIL] copytree   {src}  ➜  {dst}")
-        return str(shutil.copytree(real_src, real_dst, **kwargs))
+        existed = real_dst.exists()
+        result = shutil.copytree(real_src, real_dst, **kwargs)
+        self._z_lib._record_transfer((src_handle, src_internal), (dst_handle, dst_internal), move=False, dst_existed=existed)
+        return str(result)
 
     def rmtree(self, path: str, **kwargs) -> None:
-        real_path = self._z_lib.resolve(path)
+        real_path, handle, internal_path = self._z_lib._resolve(path)
         print(f"  🗑  [Z_SHUTIL] rmtree   › {path}")
         shutil.rmtree(real_path, **kwargs)
+        self._z_lib._record(handle, "deleted", internal_path)
+
+
+def _destination(handle: Optional[ZipHandle], internal_path: str, real_dst: Path, result: "os.PathLike | str") -> Tuple[Optional[ZipHandle], str]:
+    """
+    copy2 / move は dst が既存ディレクトリならその中へ配置する。
+    実際の配置先を (handle, ZIP内部パス) に直して返す。
+    """
+    result = Path(result)
+    if handle is None or result == real_dst:
+        return handle, internal_path
+    return handle, f"{internal_path.strip('/')}/{result.name}".lstrip("/")
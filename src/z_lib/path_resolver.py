@@ -1,7 +1,7 @@
 import os
 import re
 from pathlib import Path
-from typing import Tuple, Optional, Any, Dict
+from typing import Tuple, Optional, Any, Dict, Iterable, Iterator
 from .exceptions import ZipPathError, ZipNotLoadedError
 from ._types import ZipHandle
 
@@ -60,6 +60,34 @@ def find_longest_match_handle(path: str, loaded_zips: Dict[str, ZipHandle]) -> T
             
     return None, path
 
+def match_many(paths: Iterable[str], loaded_zips: Dict[str, ZipHandle]) -> Iterator[Tuple[str, Optional[ZipHandle], str]]:
+    """
+    Batched find_longest_match_handle.
+    Paths sharing a parent directory reuse a single lookup of that parent, so a batch
+    pays the longest-match (and Path.resolve fallback) cost once per distinct directory.
+
+    Yields:
+        (path, handle, internal path) in input order; (path, None, path) for local paths.
+    """
+    parents: Dict[str, Tuple[Optional[ZipHandle], str]] = {}
+    for path in paths:
+        norm_path = normalize_path(path)
+        parent, sep, name = norm_path.rpartition("/")
+        if not sep or not name or name.lower().endswith(".zip") or norm_path in loaded_zips:
+            # ZIP のルートそのものを指している可能性があるパスは個別に判定する
+            handle, internal_path = find_longest_match_handle(norm_path, loaded_zips)
+            yield path, handle, internal_path if handle else path
+            continue
+
+        cached = parents.get(parent)
+        if cached is None:
+            cached = parents[parent] = find_longest_match_handle(parent or "/", loaded_zips)
+        handle, internal_parent = cached
+        if handle is None:
+            yield path, None, path
+        else:
+            yield path, handle, f"{internal_parent}/{name}" if internal_parent else name
+
 def resolve_to_real_path(path: str, loaded_zips: Dict[str, ZipHandle]) -> Path:
     """
     Resolve a virtual path to a real temporary filesystem path.
@@ -76,7 +104,13 @@ def resolve_to_real_path(path: str, loaded_zips: Dict[str, ZipHandle]) -> Path:
         ZipNotLoadedError: If the ZIP file part of the path is not loaded.
     """
     handle, internal_path = find_longest_match_handle(path, loaded_zips)
-    
+    return resolve_match(path, handle, internal_path)
+
+def resolve_match(path: str, handle: Optional[ZipHandle], internal_path: str) -> Path:
+    """
+    Turn the result of find_longest_match_handle into a real filesystem path.
+    See resolve_to_real_path for the semantics and errors.
+    """
     if handle:
         return Path(handle["temp_dir"]) / internal_path
     
@@ -0,0 +1,88 @@
+import time
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Deque, Iterable, Iterator, Optional, Tuple
+
+
+class Prefetcher:
+    """
+    Reads a known sequence of files ahead of the consumer.
+
+    Up to `depth` upcoming files are read in background threads into an in-memory
+    buffer pool while the current one is consumed. Iterating yields (path, item) in
+    the order of the input, where item is the content (or `wrap(content)`).
+
+    Attributes:
+        stall_time: Total seconds the consumer spent waiting for a file that was not ready yet.
+        stalls: Number of times the consumer had to wait.
+        consumed: Number of files handed to the consumer so far.
+    """
+
+    def __init__(
+        self,
+        items: Iterable[Tuple[str, Callable[[], bytes]]],
+        depth: int = 8,
+        workers: int = 1,
+        wrap: Optional[Callable[[bytes], Any]] = None,
+    ):
+        if depth < 1:
+            raise ValueError("depth must be at least 1")
+        self.depth = depth
+        self.stall_time = 0.0
+        self.stalls = 0
+        self.consumed = 0
+        self._items = iter(items)
+        self._wrap = wrap
+        self._pending: Deque[Tuple[str, Future]] = deque()
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="z_lib_prefetch")
+        self._fill()
+
+    @property
+    def buffered(self) -> int:
+        """Number of upcoming files already read and waiting in the buffer pool."""
+        return sum(1 for _path, future in self._pending if future.done())
+
+    @property
+    def in_flight(self) -> int:
+        """Number of upcoming files buffered or being read."""
+        return len(self._pending)
+
+    def _fill(self) -> None:
+        while len(self._pending) < self.depth:
+            try:
+                path, read = next(self._items)
+            except StopIteration:
+                return
+            self._pending.append((path, self._executor.submit(read)))
+
+    def __iter__(self) -> Iterator[Tuple[str, Any]]:
+        return self
+
+    def __next__(self) -> Tuple[str, Any]:
+        if not self._pending:
+            self.close()
+            raise StopIteration
+        path, future = self._pending.popleft()
+        if future.done():
+            data = future.result()
+        else:
+            started = time.perf_counter()
+            data = future.result()
+            self.stall_time += time.perf_counter() - started
+            self.stalls += 1
+        self._fill()
+        self.consumed += 1
+        return path, self._wrap(data) if self._wrap else data
+
+    def close(self) -> None:
+        """Stop reading ahead and drop buffered files."""
+        for _path, future in self._pending:
+            future.cancel()
+        self._pending.clear()
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def __enter__(self) -> "Prefetcher":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
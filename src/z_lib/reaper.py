@@ -0,0 +1,316 @@
+import os
+import shutil
+import stat
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import BinaryIO, Dict, Optional
+
+# 一時ファイルはすべてユーザーごとのディレクトリ "<tmp>/z_lib-<uid>" の下に置く。
+# マウントごとの展開先は "z_lib_<pid>_<ランダム>/data" とし、隣の ".lock" を所有プロセスが
+# 削除し終えるまでロックし続ける。ロックを取れるディレクトリは所有者がもういない孤児である
+# (pid での生存確認はコンテナ間で /tmp を共有する場合や pid の再利用で誤判定するため使わない)。
+# 削除待ちのディレクトリは "z_lib_trash" へリネームしてからバックグラウンドスレッドが少しずつ削除する。
+TEMP_PREFIX = "z_lib_"
+TRASH_NAME = "z_lib_trash"
+LOCK_NAME = ".lock"
+DATA_NAME = "data"
+
+# 作成直後 (ロックを取る前) のディレクトリを他のプロセスが消さないための猶予 (秒)
+_ORPHAN_GRACE = 60
+# ロックファイルのない残骸は、この時間以上更新がなければ孤児とみなす
+_UNLOCKED_ORPHAN_AGE = 24 * 60 * 60
+
+# 終了時にバックグラウンド削除の完了を待つ上限 (秒)。超えたら残りを同期的に削除する
+EXIT_TIMEOUT = 5.0
+
+
+def temp_prefix() -> str:
+    """Prefix for mkdtemp that records the owning process id (informational only)."""
+    return f"{TEMP_PREFIX}{os.getpid()}_"
+
+
+def user_temp_root() -> Path:
+    """
+    Per-user directory under the system temp dir that holds every z_lib temp dir,
+    so the trash and the orphan sweep never touch other users' files.
+    """
+    if hasattr(os, "getuid"):
+        name = f"z_lib-{os.getuid()}"
+    else:
+        name = f"z_lib-{os.environ.get('USERNAME', 'user')}"
+    root = Path(tempfile.gettempdir()) / name
+    try:
+        root.mkdir(mode=0o700, exist_ok=True)
+        st = os.lstat(root)
+        if not stat.S_ISDIR(st.st_mode) or (hasattr(os, "getuid") and st.st_uid != os.getuid()):
+            raise PermissionError(f"{root} is not a directory owned by this user")
+    except OSError:
+        # 他のユーザーが同名のパスを作っていた場合などは、このプロセス専用のディレクトリを使う
+        root = Path(tempfile.mkdtemp(prefix=f"{name}-"))
+    return root
+
+
+def _try_lock(path: Path, create: bool = False) -> Optional[BinaryIO]:
+    """
+    Open `path` and take an exclusive lock on it without blocking.
+    Returns the open file (closing it releases the lock), or None if the lock is held.
+    """
+    f = open(path, "wb" if create else "r+b")
+    try:
+        if os.name == "nt":
+            import msvcrt
+            msvcrt.locking(f.fileno(), msvcrt.LK_NBLCK, 1)
+        else:
+            import fcntl
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except OSError:
+        f.close()
+        return None
+    return f
+
+
+class Reaper:
+    """
+    Creates per-mount temp directories and deletes discarded ones in a background thread.
+
+    `discard` renames a directory into the trash area, which is a single cheap
+    metadata operation, and returns immediately. A daemon thread then removes the
+    trash with lowered priority, pausing every `batch` deletions so it does not
+    starve foreground I/O. At exit, `drain` finishes the remaining work so short-lived
+    processes do not leave their trash behind.
+    """
+
+    def __init__(self, root: Optional[str] = None, batch: int = 256, pause: float = 0.005):
+        self.root = Path(root) if root else user_temp_root()
+        self.trash = self.root / TRASH_NAME
+        self.batch = batch
+        self.pause = pause
+        self._cond = threading.Condition()
+        self._queue: list = []
+        self._busy: Optional[Path] = None
+        self._draining = False
+        self._thread: Optional[threading.Thread] = None
+        self._locks: Dict[str, BinaryIO] = {}  # 所有しているディレクトリ名 → ロック中のファイル
+
+    def make_temp_dir(self) -> str:
+        """
+        Create a temp directory owned by this process and return the path to put files in.
+        The owner holds a lock file next to it until the directory is deleted.
+        """
+        owner = Path(tempfile.mkdtemp(prefix=temp_prefix(), dir=self.root))
+        lock = _try_lock(owner / LOCK_NAME, create=True)
+        if lock is None:
+            shutil.rmtree(owner, ignore_errors=True)
+            raise OSError(f"Could not lock new temp directory: {owner}")
+        with self._cond:
+            self._locks[owner.name] = lock
+        data = owner / DATA_NAME
+        data.mkdir()
+        return str(data)
+
+    def discard(self, path: str) -> None:
+        """Schedule `path` for deletion. It disappears from its original location at once."""
+        src = _owner_of(Path(path))
+        if not src.exists():
+            self._unlock(src.name)
+            return
+        try:
+            self.trash.mkdir(exist_ok=True)
+            target = self.trash / src.name
+            os.rename(src, target)
+        except OSError:
+            # 別ボリュームなどでリネームできない場合は同期的に削除する
+            self._delete(src)
+            return
+        self._enqueue(target)
+
+    def remove(self, path: str) -> None:
+        """Delete `path` (a directory from make_temp_dir, or any directory) right away."""
+        self._delete(_owner_of(Path(path)))
+
+    def sweep(self) -> int:
+        """
+        Schedule removal of temp directories whose owning process no longer runs,
+        i.e. whose lock file can be locked. Returns the number of directories scheduled.
+        """
+        count = 0
+        now = time.time()
+        candidates = []
+        try:
+            candidates.extend(p for p in self.root.iterdir() if p.name.startswith(TEMP_PREFIX) and p.name != TRASH_NAME)
+        except OSError:
+            return 0
+        if self.trash.is_dir():
+            candidates.extend(self.trash.iterdir())
+
+        for path in candidates:
+            with self._cond:
+                if path.name in self._locks:
+                    continue
+            try:
+                age = now - path.stat().st_mtime
+            except OSError:
+                continue
+            if age < _ORPHAN_GRACE:
+                continue
+            try:
+                lock = _try_lock(path / LOCK_NAME)
+            except FileNotFoundError:
+                if age < _UNLOCKED_ORPHAN_AGE:
+                    continue
+                lock = None
+            except OSError:
+                continue
+            else:
+                if lock is None:
+                    continue  # 所有プロセスが使用中
+                with self._cond:
+                    self._locks[path.name] = lock
+            if path.parent == self.trash:
+                self._enqueue(path)
+            else:
+                self.discard(str(path))
+            count += 1
+        return count
+
+    def sweep_async(self) -> Optional[threading.Thread]:
+        """
+        Run `sweep` in a daemon thread so the caller does not wait for the scan of
+        the temp root. Returns the thread, or None if no thread could be started.
+        """
+        thread = threading.Thread(target=self._sweep_quietly, name="z_lib_sweep", daemon=True)
+        try:
+            thread.start()
+        except RuntimeError:
+            # 終了処理中は掃除を次のプロセスに任せる
+            return None
+        return thread
+
+    def _sweep_quietly(self) -> None:
+        _lower_thread_priority()
+        try:
+            self.sweep()
+        except OSError:
+            pass
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """Block until all scheduled deletions are done. Returns False on timeout."""
+        with self._cond:
+            return self._cond.wait_for(lambda: not self._queue and self._busy is None, timeout)
+
+    def drain(self, timeout: Optional[float] = EXIT_TIMEOUT) -> None:
+        """
+        Finish every scheduled deletion before returning (used at exit). The background
+        thread gets `timeout` seconds without pauses; whatever is left after that is
+        removed synchronously.
+        """
+        self._draining = True
+        if self.wait(timeout):
+            return
+        with self._cond:
+            left, self._queue = self._queue, []
+            if self._busy is not None:
+                left.append(self._busy)
+        for path in left:
+            self._delete(path)
+
+    def _enqueue(self, path: Path) -> None:
+        with self._cond:
+            if self._thread is None or not self._thread.is_alive():
+                thread = threading.Thread(target=self._run, name="z_lib_reaper", daemon=True)
+                try:
+                    thread.start()
+                except RuntimeError:
+                    # 終了処理中 (atexit) は新しいスレッドを起動できない
+                    thread = None
+                self._thread = thread
+            if self._thread is not None:
+                self._queue.append(path)
+                self._cond.notify_all()
+                return
+        self._delete(path)
+
+    def _run(self) -> None:
+        _lower_thread_priority()
+        while True:
+            with self._cond:
+                self._cond.wait_for(lambda: self._queue)
+                path = self._queue.pop(0)
+                self._busy = path
+            try:
+                self._delete(path, throttle=True)
+            finally:
+                with self._cond:
+                    self._busy = None
+                    self._cond.notify_all()
+
+    def _delete(self, path: Path, throttle: bool = False) -> None:
+        removed = 0
+        for root, dirs, files in os.walk(path, topdown=False):
+            for name in files:
+                try:
+                    os.unlink(os.path.join(root, name))
+                except OSError:
+                    pass
+                removed += 1
+                if throttle and removed % self.batch == 0 and not self._draining:
+                    time.sleep(self.pause)
+            for name in dirs:
+                try:
+                    os.rmdir(os.path.join(root, name))
+                except OSError:
+                    pass
+        # ロックは中身を消し終えてから手放す (Windows では開いたままのロックファイルは消せない)
+        self._unlock(path.name)
+        shutil.rmtree(path, ignore_errors=True)
+
+    def _unlock(self, name: str) -> None:
+        with self._cond:
+            lock = self._locks.pop(name, None)
+        if lock is not None:
+            lock.close()
+
+
+def _owner_of(path: Path) -> Path:
+    """The directory that make_temp_dir created for `path` (the path itself otherwise)."""
+    if path.name == DATA_NAME and path.parent.name.startswith(TEMP_PREFIX):
+        return path.parent
+    return path
+
+
+def _lower_thread_priority() -> None:
+    """
+    Best effort: lower the reaper thread's CPU priority. On Linux the default I/O
+    priority follows the nice value, so this also de-prioritises its disk I/O.
+    """
+    if sys.platform.startswith("linux"):
+        try:
+            os.setpriority(os.PRIO_PROCESS, threading.get_native_id(), 19)
+        except OSError:
+            pass
+
+
+_reaper: Optional[Reaper] = None
+_reaper_lock = threading.Lock()
+
+
+def get_reaper() -> Reaper:
+    """
+    Process-wide reaper. The first call also starts a background sweep for orphans
+    of crashed processes; both the scan and the deletions run off the caller's thread.
+    """
+    global _reaper
+    with _reaper_lock:
+        if _reaper is None:
+            _reaper = Reaper()
+            _reaper.sweep_async()
+        return _reaper
+
+
+def drain_at_exit() -> None:
+    """Finish this process's pending deletions. Does nothing if nothing was ever discarded."""
+    if _reaper is not None:
+        _reaper.drain()
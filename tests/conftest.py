@@ -1,6 +1,11 @@
 import pytest
 from z_lib.core import Z_Lib
 
+@pytest.fixture(autouse=True)
+def isolated_index_cache(tmp_path_factory, monkeypatch):
+    # Keep persisted archive indexes out of the user's cache directory
+    monkeypatch.setenv("Z_LIB_CACHE_DIR", str(tmp_path_factory.mktemp("index_cache")))
+
 @pytest.fixture
 def z_lib_instance():
     z = Z_Lib()
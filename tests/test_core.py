@@ -1,9 +1,13 @@
 import pytest
+import io
 import os
+import time
 import zipfile
 from pathlib import Path
 from z_lib.core import Z_Lib
-from z_lib.exceptions import ZipNotLoadedError
+from z_lib.backend import zipfile_backend
+from z_lib.backend.zipfile_backend import ZipFileBackend
+from z_lib.exceptions import ZipNotLoadedError, ZipIntegrityError
 from z_lib.path_resolver import normalize_path
 
 @pytest.fixture
@@ -105,3 +109,424 @@ def test_load_nest(z_lib_instance, tmp_path):
     
     assert normalize_path(str(zip1)) in z_lib_instance._loaded_zips
     assert normalize_path(str(zip2)) in z_lib_instance._loaded_zips
+
+@pytest.mark.parametrize("workers", [None, 4])
+def test_read_many(z_lib_instance, tmp_path, workers):
+    zip_path = tmp_path / "many.zip"
+    with zipfile.ZipFile(zip_path, "w") as zf:
+        for i in range(20):
+            zf.writestr(f"img/{i:02d}.bin", bytes([i]) * (i + 1))
+    local = tmp_path / "local.txt"
+    local.write_bytes(b"local")
+    z_lib_instance.load_zip(str(zip_path), mode="r")
+
+    # Request members out of archive order, mixed with a local file
+    paths = [f"{zip_path}/img/{i:02d}.bin" for i in reversed(range(20))]
+    paths.insert(5, str(local))
+    data = z_lib_instance.read_many(paths, workers=workers)
+    assert data[5] == b"local"
+    assert data[0] == bytes([19]) * 20
+    assert data[-1] == bytes([0])
+
+    # The iterator variant reads members in central-directory order
+    read_order = [path for path, _ in z_lib_instance.iter_read(paths, workers=workers)]
+    assert read_order[:20] == [f"{zip_path}/img/{i:02d}.bin" for i in range(20)]
+    assert read_order[-1] == str(local)
+
+def test_read_many_unloaded_zip(z_lib_instance, tmp_path):
+    with pytest.raises(ZipNotLoadedError):
+        z_lib_instance.read_many([str(tmp_path / "missing.zip/a.txt")])
+
+def test_prefetch_and_open_sequence(z_lib_instance, tmp_path):
+    zip_path = tmp_path / "seq.zip"
+    with zipfile.ZipFile(zip_path, "w") as zf:
+        for i in range(10):
+            zf.writestr(f"{i}.txt", str(i))
+    z_lib_instance.load_zip(str(zip_path), mode="r")
+    paths = [f"{zip_path}/{i}.txt" for i in range(10)]
+
+    with z_lib_instance.prefetch(paths, depth=3, workers=2) as seq:
+        assert seq.in_flight == 3
+        assert [data for _, data in seq] == [str(i).encode() for i in range(10)]
+        assert seq.consumed == 10
+        assert seq.stall_time >= 0.0
+
+    contents = [(path, f.read()) for path, f in z_lib_instance.open_sequence(paths, depth=2)]
+    assert contents == [(path, str(i).encode()) for i, path in enumerate(paths)]
+
+def test_refcounted_mount_sharing(z_lib_instance, test_zip):
+    key = normalize_path(str(test_zip))
+    first = z_lib_instance.load_zip(str(test_zip), mode="r")
+    with z_lib_instance.load_zip(str(test_zip), mode="r") as second:
+        assert second.keys == [key]
+        assert z_lib_instance._mount_refs[key] == 2
+
+    # Still mounted for the first holder
+    assert key in z_lib_instance._loaded_zips
+    first.release()
+    first.release()  # no-op
+    assert key not in z_lib_instance._loaded_zips
+
+    # force=True tears down regardless of outstanding references
+    z_lib_instance.load_zip(str(test_zip))
+    z_lib_instance.load_zip(str(test_zip))
+    z_lib_instance.unload_zip(str(test_zip), force=True)
+    assert key not in z_lib_instance._loaded_zips
+
+def test_shared_mount_warns_on_option_mismatch(z_lib_instance, test_zip, capsys):
+    key = normalize_path(str(test_zip))
+    with z_lib_instance.load_zip(str(test_zip), mode="r", backend="zipfile"):
+        capsys.readouterr()
+        with z_lib_instance.load_zip(str(test_zip), mode="r"):
+            assert "options ignored" not in capsys.readouterr().out
+
+        with z_lib_instance.load_zip(str(test_zip), mode="rw", backend="memory", dedup=True):
+            out = capsys.readouterr().out
+            assert "options ignored" in out
+            assert "mode='rw' (kept 'r')" in out
+            assert "backend='memory' (kept 'zipfile')" in out
+            assert "dedup=True (kept False)" in out
+        # 既存のマウントは最初の設定のまま
+        assert z_lib_instance._loaded_zips[key]["mode"] == "r"
+        assert z_lib_instance._loaded_zips[key]["backend"] == "zipfile"
+
+def test_stale_mount_release_does_not_touch_remount(z_lib_instance, test_zip):
+    key = normalize_path(str(test_zip))
+    stale = z_lib_instance.load_zip(str(test_zip), mode="r")
+    z_lib_instance.unload_zip(str(test_zip), force=True)
+    current = z_lib_instance.load_zip(str(test_zip), mode="r")
+
+    stale.release()
+    assert key in z_lib_instance._loaded_zips
+    assert z_lib_instance._mount_refs[key] == 1
+    current.release()
+    assert key not in z_lib_instance._loaded_zips
+
+def test_failed_multi_load_returns_references(z_lib_instance, test_zip, tmp_path):
+    key = normalize_path(str(test_zip))
+    held = z_lib_instance.load_zip(str(test_zip), mode="r")
+    other = tmp_path / "other.zip"
+    with zipfile.ZipFile(other, "w") as zf:
+        zf.writestr("o.txt", "o")
+
+    with pytest.raises(FileNotFoundError):
+        z_lib_instance.load_zip(str(test_zip), str(other), str(tmp_path / "missing.zip"), mode="r")
+    assert z_lib_instance._mount_refs[key] == 1
+    assert normalize_path(str(other)) not in z_lib_instance._loaded_zips
+    held.release()
+    assert key not in z_lib_instance._loaded_zips
+
+def test_idle_timeout_unmounts_released_zips(test_zip):
+    z = Z_Lib(idle_timeout=0.05)
+    key = normalize_path(str(test_zip))
+    try:
+        with z.load_zip(str(test_zip), mode="r"):
+            pass
+        # Kept warm after release, so a quick re-acquire does not remount
+        assert key in z._loaded_zips
+        handle = z._loaded_zips[key]
+        with z.load_zip(str(test_zip), mode="r"):
+            assert z._loaded_zips[key] is handle
+
+        time.sleep(0.1)
+        assert z.collect_idle() == 1
+        assert key not in z._loaded_zips
+    finally:
+        z._cleanup()
+
+def test_max_mounted_evicts_lru(tmp_path):
+    z = Z_Lib(idle_timeout=60, max_mounted=2)
+    zips = []
+    for name in ("a", "b", "c"):
+        p = tmp_path / f"{name}.zip"
+        with zipfile.ZipFile(p, "w") as zf:
+            zf.writestr("f.txt", name)
+        zips.append(p)
+    keys = [normalize_path(str(p)) for p in zips]
+    try:
+        z.load_zip(str(zips[0]), mode="r").release()
+        z.load_zip(str(zips[1]), mode="r").release()
+        z.resolve(f"{zips[0]}/f.txt")  # a.zip is now more recently used than b.zip
+
+        held = z.load_zip(str(zips[2]), mode="r")
+        assert set(z._loaded_zips) == {keys[0], keys[2]}
+
+        # Referenced mounts are never evicted; the limit is soft
+        z.load_zip(str(zips[1]), mode="r")
+        assert set(z._loaded_zips) == {keys[1], keys[2]}
+        held.release()
+    finally:
+        z._cleanup()
+
+def test_idle_expiry_only_runs_on_load_and_unload(tmp_path, monkeypatch):
+    z = Z_Lib(idle_timeout=0.05)
+    a, b, c = (tmp_path / f"{name}.zip" for name in "abc")
+    for p in (a, b, c):
+        with zipfile.ZipFile(p, "w") as zf:
+            zf.writestr("f.txt", p.stem)
+    try:
+        z.load_zip(str(a)).release()
+        held = z.load_zip(str(b), mode="r")
+        time.sleep(0.1)
+        # Unrelated reads never unmount (or save) other archives
+        z.os.stat(f"{b}/f.txt")
+        z.resolve(f"{b}/f.txt")
+        assert normalize_path(str(a)) in z._loaded_zips
+
+        # A failing save during expiry is logged instead of raised into load_zip
+        def fail(*args, **kwargs):
+            raise OSError("disk full")
+        monkeypatch.setattr(ZipFileBackend, "_write_to_path", fail)
+        z.load_zip(str(c), mode="r").release()
+        assert normalize_path(str(a)) not in z._loaded_zips
+        held.release()
+    finally:
+        monkeypatch.undo()
+        z._cleanup()
+
+class _PipeWriter(io.RawIOBase):
+    """Write-only, unseekable stream standing in for a socket or pipe."""
+    def __init__(self):
+        self.chunks = []
+    def writable(self):
+        return True
+    def write(self, b):
+        self.chunks.append(bytes(b))
+        return len(b)
+
+def test_export_to_path_and_stream(z_lib_instance, test_zip, tmp_path):
+    z_lib_instance.load_zip(str(test_zip), mode="rw")
+    with z_lib_instance.open(f"{test_zip}/b.txt", "w") as f:
+        f.write("world")
+
+    dest = tmp_path / "out" / "copy.zip"
+    z_lib_instance.export(str(test_zip), str(dest), compression=zipfile.ZIP_STORED)
+    with zipfile.ZipFile(dest) as zf:
+        assert sorted(zf.namelist()) == ["a.txt", "b.txt"]
+        assert zf.getinfo("b.txt").compress_type == zipfile.ZIP_STORED
+
+    pipe = _PipeWriter()
+    z_lib_instance.export(str(test_zip), pipe)
+    with zipfile.ZipFile(io.BytesIO(b"".join(pipe.chunks))) as zf:
+        assert zf.read("a.txt") == b"hello"
+        assert zf.read("b.txt") == b"world"
+
+    # The source archive and the mount are untouched
+    assert normalize_path(str(test_zip)) in z_lib_instance._loaded_zips
+    with zipfile.ZipFile(test_zip) as zf:
+        assert zf.namelist() == ["a.txt"]
+
+    with pytest.raises(ZipNotLoadedError):
+        z_lib_instance.export(str(tmp_path / "missing.zip"), str(dest))
+
+def _corrupt_member(zip_path, name):
+    """Flip one byte of `name`'s stored data so its CRC no longer matches."""
+    with zipfile.ZipFile(zip_path) as zf:
+        info = zf.getinfo(name)
+    data = bytearray(zip_path.read_bytes())
+    offset = info.header_offset + 30 + len(info.filename.encode()) + len(info.extra)
+    data[offset] ^= 0xFF
+    zip_path.write_bytes(bytes(data))
+
+@pytest.mark.parametrize("workers", [None, 3])
+def test_verify_reports_bad_members(z_lib_instance, tmp_path, workers):
+    zip_path = tmp_path / "v.zip"
+    with zipfile.ZipFile(zip_path, "w", zipfile.ZIP_STORED) as zf:
+        for i in range(6):
+            zf.writestr(f"dir/f{i}.txt", f"payload {i}" * 50)
+    report = z_lib_instance.verify(str(zip_path), workers=workers)
+    assert report["bad"] == {} and report["checked"] == 6
+
+    _corrupt_member(zip_path, "dir/f4.txt")
+    report = z_lib_instance.verify(str(zip_path), workers=workers)
+    assert list(report["bad"]) == ["dir/f4.txt"]
+    assert "CRC" in report["bad"]["dir/f4.txt"]
+
+def test_load_zip_verify_fails_before_extraction(z_lib_instance, test_zip):
+    _corrupt_member(test_zip, "a.txt")
+    with pytest.raises(ZipIntegrityError):
+        z_lib_instance.load_zip(str(test_zip), verify=True)
+    assert normalize_path(str(test_zip)) not in z_lib_instance._loaded_zips
+
+@pytest.mark.parametrize("backend", ["zipfile", "memory"])
+def test_dedup_save_reuses_compressed_payloads(z_lib_instance, tmp_path, backend):
+    zip_path = tmp_path / "dup.zip"
+    template = b"<html>" + b"same template " * 500 + b"</html>"
+    z_lib_instance.load_zip(str(zip_path), create=True, backend=backend, dedup=True)
+    for i in range(4):
+        with z_lib_instance.open(f"{zip_path}/p{i}.html", "wb") as f:
+            f.write(template)
+    with z_lib_instance.open(f"{zip_path}/other.bin", "wb") as f:
+        f.write(b"x" * len(template))  # same size, different content
+    z_lib_instance.unload_zip(str(zip_path))
+
+    stats = z_lib_instance.last_save_stats
+    assert stats["files"] == 5 and stats["unique"] == 2 and stats["duplicates"] == 3
+    assert stats["deduplicated_bytes"] == 3 * len(template)
+    assert stats["dedup_ratio"] == pytest.approx(5 / 2)
+
+    with zipfile.ZipFile(zip_path) as zf:
+        assert zf.testzip() is None
+        infos = [zf.getinfo(f"p{i}.html") for i in range(4)]
+        assert len({info.header_offset for info in infos}) == 4
+        assert {info.CRC for info in infos} == {infos[0].CRC}
+        assert all(zf.read(info) == template for info in infos)
+    assert z_lib_instance.verify(str(zip_path))["bad"] == {}
+
+@pytest.mark.parametrize("backend", ["zipfile", "memory"])
+def test_dedup_export_to_write_only_file(z_lib_instance, tmp_path, backend):
+    zip_path = tmp_path / "dup.zip"
+    z_lib_instance.load_zip(str(zip_path), create=True, backend=backend, dedup=True)
+    for i in range(3):
+        with z_lib_instance.open(f"{zip_path}/p{i}.txt", "w") as f:
+            f.write("same content " * 100)
+
+    dest = tmp_path / "out.zip"
+    with open(dest, "wb") as f:  # seekable but not readable
+        z_lib_instance.export(str(zip_path), f)
+    assert z_lib_instance.last_save_stats["duplicates"] == 0
+
+    with zipfile.ZipFile(dest) as zf:
+        assert zf.testzip() is None
+        assert all(zf.read(f"p{i}.txt") == b"same content " * 100 for i in range(3))
+
+def test_save_copies_moved_and_unchanged_members(z_lib_instance, tmp_path):
+    zip_path = tmp_path / "moves.zip"
+    payload = b"compressible payload " * 2000
+    with zipfile.ZipFile(zip_path, "w", zipfile.ZIP_DEFLATED) as zf:
+        zf.writestr("src/a.bin", payload)
+        zf.writestr("src/sub/b.bin", payload[::-1])
+        zf.writestr("keep.txt", "keep")
+        zf.writestr("edit.txt", "before")
+    with zipfile.ZipFile(zip_path) as zf:
+        crcs = {info.filename: info.CRC for info in zf.infolist()}
+
+    z = z_lib_instance
+    key = str(zip_path)
+    z.load_zip(key)
+    z.os.rename(f"{key}/src", f"{key}/dst")
+    z.shutil.move(f"{key}/dst/sub/b.bin", f"{key}/b.bin")
+    with z.open(f"{key}/edit.txt", "w") as f:
+        f.write("after")
+    z.unload_zip(key)
+
+    stats = z.last_save_stats
+    assert stats["files"] == 4 and stats["reused"] == 3 and stats["unique"] == 1
+    with zipfile.ZipFile(zip_path) as zf:
+        assert zf.testzip() is None
+        assert zf.read("dst/a.bin") == payload and zf.getinfo("dst/a.bin").CRC == crcs["src/a.bin"]
+        assert zf.read("b.bin") == payload[::-1]
+        assert zf.read("keep.txt") == b"keep"
+        assert zf.read("edit.txt") == b"after"
+    assert z.verify(key)["bad"] == {}
+
+def test_save_copies_files_moved_into_new_directories(z_lib_instance, tmp_path):
+    zip_path = tmp_path / "restructure.zip"
+    with zipfile.ZipFile(zip_path, "w", zipfile.ZIP_DEFLATED) as zf:
+        for i in range(5):
+            zf.writestr(f"old/{i}.txt", f"file {i} " * 100)
+
+    z = z_lib_instance
+    key = str(zip_path)
+    z.load_zip(key)
+    z.os.makedirs(f"{key}/new/deeper")
+    for i in range(5):
+        z.os.rename(f"{key}/old/{i}.txt", f"{key}/new/deeper/{i}.txt")
+    z.unload_zip(key)
+
+    stats = z.last_save_stats
+    assert stats["reused"] == 5 and stats["unique"] == 0
+    with zipfile.ZipFile(zip_path) as zf:
+        assert zf.testzip() is None
+        assert all(zf.read(f"new/deeper/{i}.txt") == f"file {i} ".encode() * 100 for i in range(5))
+
+def test_save_checks_contents_copied_over_original_names(z_lib_instance, tmp_path):
+    zip_path = tmp_path / "copied.zip"
+    with zipfile.ZipFile(zip_path, "w", zipfile.ZIP_DEFLATED) as zf:
+        zf.writestr(zipfile.ZipInfo("src/a.txt", (2020, 1, 1, 0, 0, 0)), "aaaa", zipfile.ZIP_DEFLATED)
+        zf.writestr(zipfile.ZipInfo("other/a.txt", (2020, 1, 1, 0, 0, 0)), "bbbb", zipfile.ZIP_DEFLATED)
+
+    z = z_lib_instance
+    key = str(zip_path)
+    z.load_zip(key)
+    z.os.rename(f"{key}/src", f"{key}/old")
+    z.shutil.copytree(f"{key}/other", f"{key}/src")  # same size and mtime as the original src/a.txt
+    z.unload_zip(key)
+
+    assert z.last_save_stats["reused"] == 2
+    with zipfile.ZipFile(zip_path) as zf:
+        assert zf.read("src/a.txt") == b"bbbb"
+        assert zf.read("old/a.txt") == b"aaaa"
+
+def test_save_recompresses_members_changed_through_resolved_paths(z_lib_instance, tmp_path):
+    zip_path = tmp_path / "exposed.zip"
+    with zipfile.ZipFile(zip_path, "w", zipfile.ZIP_DEFLATED) as zf:
+        zf.writestr("a.txt", "original")
+        zf.writestr("b.txt", "untouched")
+
+    z = z_lib_instance
+    key = str(zip_path)
+    z.load_zip(key)
+    real = z.resolve(f"{key}/a.txt")
+    st = real.stat()
+    real.write_text("modified")  # same size, mtime put back
+    os.utime(real, ns=(st.st_atime_ns, st.st_mtime_ns))
+    z.unload_zip(key)
+
+    assert z.last_save_stats["reused"] == 1
+    with zipfile.ZipFile(zip_path) as zf:
+        assert zf.read("a.txt") == b"modified"
+        assert zf.read("b.txt") == b"untouched"
+
+@pytest.mark.parametrize("raw_copy", [True, False], ids=["raw_copy", "fallback"])
+def test_raw_copy_saves_round_trip(z_lib_instance, tmp_path, monkeypatch, raw_copy):
+    if not raw_copy:
+        # An interpreter whose zipfile internals were not checked: plain writes only
+        monkeypatch.setattr(zipfile_backend, "_RAW_COPY_VERSIONS", ((0, 0), (0, 0)))
+    zip_path = tmp_path / "round.zip"
+    with zipfile.ZipFile(zip_path, "w", zipfile.ZIP_DEFLATED) as zf:
+        zf.writestr("a.txt", "alpha " * 500)
+        zf.writestr("sub/b.txt", "beta " * 500)
+
+    z = z_lib_instance
+    key = str(zip_path)
+    z.load_zip(key, dedup=True)
+    z.os.rename(f"{key}/sub", f"{key}/moved")
+    for name in ("c1.txt", "c2.txt"):
+        with z.open(f"{key}/{name}", "w") as f:
+            f.write("same " * 500)
+    z.unload_zip(key)
+
+    stats = z.last_save_stats
+    assert (stats["reused"], stats["duplicates"]) == ((2, 1) if raw_copy else (0, 0))
+    with zipfile.ZipFile(zip_path) as zf:
+        assert zf.testzip() is None
+        assert zf.read("moved/b.txt") == b"beta " * 500
+        assert zf.read("c2.txt") == b"same " * 500
+    assert z.verify(key)["bad"] == {}
+
+def test_resolve_many_matches_resolve(z_lib_instance, tmp_path, test_zip):
+    z = z_lib_instance
+    z.load_zip(str(test_zip))
+    mem_zip = tmp_path / "mem.zip"
+    with zipfile.ZipFile(mem_zip, "w") as zf:
+        zf.writestr("m.txt", "memory")
+    z.load_zip(str(mem_zip), backend="memory")
+    (tmp_path / "local").mkdir()
+
+    paths = (
+        [f"{test_zip}/a.txt", f"{test_zip}/sub/b.txt", str(test_zip)]
+        + [f"{mem_zip}/m.txt"]
+        + [str(tmp_path / "local" / f"f{i}.txt") for i in range(5)]
+        + ["relative/file.txt"]
+    )
+    resolved = z.resolve_many(paths)
+    assert resolved == [z.resolve(p) for p in paths]
+    assert resolved[3].read_text() == "memory"  # memory mount was materialized
+
+    chunks = list(z.iter_resolve(iter(paths), chunk_size=4))
+    assert [len(c) for c in chunks] == [4, 4, 2]
+    assert [p for c in chunks for p in c] == resolved
+
+    with pytest.raises(ZipNotLoadedError):
+        z.resolve_many([str(tmp_path / "missing.zip" / "x.txt")])
@@ -0,0 +1,77 @@
+import pytest
+import zipfile
+from z_lib.exceptions import ZipNotLoadedError
+
+@pytest.fixture
+def rw_zip(tmp_path):
+    zip_path = tmp_path / "j.zip"
+    with zipfile.ZipFile(zip_path, "w") as zf:
+        zf.writestr("a.txt", "alpha")
+        zf.writestr("b.txt", "beta")
+        zf.writestr("dir/c.txt", "gamma")
+    return zip_path
+
+def _kinds(events):
+    return [(e["kind"], e["internal"], e["internal_dest"], e["source"]) for e in events]
+
+def test_api_changes_are_journaled(z_lib_instance, rw_zip):
+    z = z_lib_instance
+    key = str(rw_zip)
+    z.load_zip(key)
+    seen = []
+    unsubscribe = z.subscribe(key, seen.append)
+
+    with z.open(f"{key}/new.txt", "w") as f:
+        f.write("n")
+    with z.open(f"{key}/a.txt", "a") as f:
+        f.write("!")
+    z.os.rename(f"{key}/b.txt", f"{key}/dir/b2.txt")
+    z.os.mkdir(f"{key}/empty")
+    z.shutil.copy2(f"{key}/new.txt", f"{key}/dir")
+    unsubscribe()
+    z.os.remove(f"{key}/dir/c.txt")
+
+    events = z.changes(key)
+    assert _kinds(events) == [
+        ("created", "new.txt", None, "api"),
+        ("modified", "a.txt", None, "api"),
+        ("moved", "b.txt", "dir/b2.txt", "api"),
+        ("created", "empty", None, "api"),
+        ("created", "dir/new.txt", None, "api"),
+        ("deleted", "dir/c.txt", None, "api"),
+    ]
+    assert events[2]["dest"].endswith("/dir/b2.txt")
+    assert seen == events[:5]
+    assert _kinds(z.changes(key, since=5)) == [("deleted", "dir/c.txt", None, "api")]
+
+    with pytest.raises(ZipNotLoadedError):
+        z.changes(f"{key}/dir")
+
+def test_reconcile_detects_writes_through_resolved_paths(z_lib_instance, rw_zip):
+    z = z_lib_instance
+    key = str(rw_zip)
+    z.load_zip(key)
+    with z.open(f"{key}/api.txt", "w") as f:
+        f.write("via api")
+
+    z.resolve(f"{key}/a.txt").write_text("changed outside")
+    (z.resolve(f"{key}/dir") / "ext.txt").write_text("created outside")
+    z.resolve(f"{key}/b.txt").unlink()
+
+    events = z.changes(key)
+    assert _kinds(events[:1]) == [("created", "api.txt", None, "api")]
+    assert sorted(_kinds(events[1:])) == [
+        ("created", "dir/ext.txt", None, "scan"),
+        ("deleted", "b.txt", None, "scan"),
+        ("modified", "a.txt", None, "scan"),
+    ]
+    assert len(z.changes(key)) == 4  # nothing new on a second reconcile
+
+def test_read_only_mount_stops_using_index_after_change(z_lib_instance, rw_zip):
+    z = z_lib_instance
+    key = str(rw_zip)
+    z.load_zip(key, mode="r")
+    assert z.os.path.getsize(f"{key}/a.txt") == 5
+    with z.open(f"{key}/a.txt", "w") as f:
+        f.write("longer text")
+    assert z.os.path.getsize(f"{key}/a.txt") == 11
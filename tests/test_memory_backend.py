@@ -0,0 +1,94 @@
+import pytest
+import os
+import zipfile
+from z_lib import Z_Lib, register_backend
+from z_lib.backend import ZipFileBackend
+from z_lib.path_resolver import normalize_path
+
+@pytest.fixture
+def small_zip(tmp_path):
+    zip_path = tmp_path / "small.zip"
+    with zipfile.ZipFile(zip_path, "w") as zf:
+        zf.writestr("a.txt", "hello")
+        zf.writestr("docs/", "")
+        zf.writestr("docs/b.txt", "world")
+    return zip_path
+
+def _handle(z, zip_path):
+    return z._loaded_zips[normalize_path(str(zip_path.resolve()))]
+
+def test_memory_mount_serves_from_ram(z_lib_instance, small_zip):
+    z = z_lib_instance
+    z.load_zip(str(small_zip), backend="memory")
+    handle = _handle(z, small_zip)
+    assert handle["backend"] == "memory" and handle["temp_dir"] == ""
+
+    with z.open(f"{small_zip}/a.txt") as f:
+        assert f.read() == "hello"
+    assert sorted(z.os.listdir(str(small_zip))) == ["a.txt", "docs"]
+    assert z.os.path.isdir(f"{small_zip}/docs")
+    assert z.os.path.getsize(f"{small_zip}/docs/b.txt") == 5
+    assert not z.os.path.exists(f"{small_zip}/missing.txt")
+    assert z.read_many([f"{small_zip}/docs/b.txt"]) == [b"world"]
+    assert [os.path.basename(p) for p in z.glob(f"{small_zip}/**/*.txt")] == ["a.txt", "b.txt"]
+
+    with z.open(f"{small_zip}/docs/new.txt", "w") as f:
+        f.write("fresh")
+    assert z.os.path.isfile(f"{small_zip}/docs/new.txt")
+    with pytest.raises(FileNotFoundError):
+        z.open(f"{small_zip}/nodir/x.txt", "w")
+    assert handle["temp_dir"] == ""  # nothing touched the disk
+
+    z.unload_zip(str(small_zip))
+    with zipfile.ZipFile(small_zip) as zf:
+        assert zf.read("docs/new.txt") == b"fresh"
+        assert zf.read("a.txt") == b"hello"
+
+def test_memory_mount_unchanged_is_not_rewritten(z_lib_instance, small_zip):
+    before = small_zip.stat().st_mtime_ns
+    z_lib_instance.load_zip(str(small_zip), backend="memory")
+    z_lib_instance.unload_zip(str(small_zip))
+    assert small_zip.stat().st_mtime_ns == before
+
+def test_resolve_materializes_memory_mount(z_lib_instance, small_zip):
+    z = z_lib_instance
+    z.load_zip(str(small_zip), backend="memory")
+    with z.open(f"{small_zip}/a.txt", "a") as f:
+        f.write(" again")
+
+    real = z.resolve(f"{small_zip}/a.txt")
+    handle = _handle(z, small_zip)
+    assert handle["tree"] is None and os.path.isdir(handle["temp_dir"])
+    assert real.read_text() == "hello again"
+
+    real.write_text("changed on disk")
+    z.unload_zip(str(small_zip))
+    with zipfile.ZipFile(small_zip) as zf:
+        assert zf.read("a.txt") == b"changed on disk"
+
+def test_memory_threshold_and_registry(tmp_path, small_zip):
+    big_zip = tmp_path / "big.zip"
+    with zipfile.ZipFile(big_zip, "w", zipfile.ZIP_STORED) as zf:
+        zf.writestr("blob.bin", os.urandom(64 * 1024))
+
+    created = []
+    def factory(**options):
+        created.append(options)
+        return ZipFileBackend(**options)
+    register_backend("custom", factory)
+
+    z = Z_Lib(memory_threshold=16 * 1024, chunk_size=4096)
+    try:
+        z.load_zip(str(small_zip), str(big_zip), mode="r")
+        assert _handle(z, small_zip)["backend"] == "memory"
+        assert _handle(z, big_zip)["backend"] == "zipfile"
+
+        z.unload_zip(str(big_zip))
+        z.load_zip(str(big_zip), mode="r", backend="custom")
+        assert _handle(z, big_zip)["backend"] == "custom"
+        assert created == [{"chunk_size": 4096}]
+
+        with pytest.raises(ValueError):
+            z.load_zip(str(tmp_path / "other.zip"), create=True, backend="nope")
+    finally:
+        z._cleanup()
@@ -2,6 +2,7 @@ import pytest
 import shutil
 import zipfile
 import os
+import time
 from pathlib import Path
 from z_lib.core import Z_Lib
 from z_lib.path_resolver import normalize_path
@@ -111,3 +112,112 @@ def test_walk_zip(z_lib_instance, test_structure):
         all_roots.append(normalize_path(root))
         
     assert f"{normalize_path(archive_path)}/inner_folder" in all_roots
+
+def test_glob_spans_local_and_zip(z_lib_instance, test_structure):
+    root = normalize_path(str(test_structure))
+    archive_path = f"{root}/archive.zip"
+    z_lib_instance.load_zip(archive_path, mode="rw")
+
+    results = z_lib_instance.glob.glob(f"{root}/**/*.txt", recursive=True)
+    assert sorted(results) == sorted([
+        f"{root}/normal_file.txt",
+        f"{archive_path}/inner_file.txt",
+        f"{archive_path}/inner_folder/inner_sub.txt",
+    ])
+
+    # Non-recursive patterns only match a single level
+    assert z_lib_instance.glob.glob(f"{archive_path}/*.txt") == [f"{archive_path}/inner_file.txt"]
+    assert z_lib_instance.glob.glob(f"{archive_path}/*/") == [f"{archive_path}/inner_folder/"]
+
+def test_glob_readonly_answers_from_index(z_lib_instance, test_structure, monkeypatch):
+    archive_path = normalize_path(str(test_structure / "archive.zip"))
+    z_lib_instance.load_zip(archive_path, mode="r")
+
+    # Read-only mounts must not touch the extracted temp dir
+    real_scandir = os.scandir
+    handle = z_lib_instance._loaded_zips[archive_path]
+    def guarded_scandir(path="."):
+        assert not str(path).startswith(handle["temp_dir"])
+        return real_scandir(path)
+    monkeypatch.setattr(os, "scandir", guarded_scandir)
+
+    results = z_lib_instance.glob(f"{archive_path}/**")
+    assert sorted(results) == [
+        f"{archive_path}/",
+        f"{archive_path}/inner_file.txt",
+        f"{archive_path}/inner_folder",
+        f"{archive_path}/inner_folder/inner_sub.txt",
+    ]
+    assert sorted(z_lib_instance.glob(f"{archive_path}/**/*_sub.txt")) == [f"{archive_path}/inner_folder/inner_sub.txt"]
+
+@pytest.mark.parametrize("mode", ["r", "rw"])
+def test_glob_matches_stdlib_for_hidden_and_trailing_recursive(z_lib_instance, tmp_path, mode):
+    import glob as std_glob
+
+    # 同じ構成を通常のディレクトリと ZIP に作り、標準の glob と結果を比べる
+    members = {
+        "a.txt": "a",
+        ".hidden": "h",
+        "sub/b.txt": "b",
+        "sub/.c.txt": "c",
+        ".dir/d.txt": "d",
+    }
+    plain = tmp_path / "plain"
+    for name, data in members.items():
+        (plain / name).parent.mkdir(parents=True, exist_ok=True)
+        (plain / name).write_text(data)
+    archive = tmp_path / "g.zip"
+    with zipfile.ZipFile(archive, "w") as zf:
+        for name, data in members.items():
+            zf.writestr(name, data)
+    archive_path = normalize_path(str(archive))
+    plain_path = normalize_path(str(plain))
+    z_lib_instance.load_zip(archive_path, mode=mode)
+
+    patterns = ["*", ".*", "**", "**/", "**/*.txt", "**/.*", "sub/*", "sub/.*", ".dir/*", "*/"]
+    for pattern in patterns:
+        expected = sorted(
+            p.replace(os.sep, "/")[len(plain_path) + 1:]
+            for p in std_glob.glob(f"{plain_path}/{pattern}", recursive=True)
+        )
+        actual = sorted(
+            p[len(archive_path) + 1:]
+            for p in z_lib_instance.glob.glob(f"{archive_path}/{pattern}", recursive=True)
+        )
+        assert actual == expected, pattern
+
+    # 末尾の "**" は起点のディレクトリ自身を含み、"." で始まる名前は含まない
+    assert f"{archive_path}/" in z_lib_instance.glob.glob(f"{archive_path}/**", recursive=True)
+    assert f"{archive_path}/.hidden" not in z_lib_instance.glob.glob(f"{archive_path}/*")
+    assert z_lib_instance.glob.glob(f"{archive_path}/.hidden") == [f"{archive_path}/.hidden"]
+
+@pytest.mark.parametrize("mode", ["r", "rw"])
+def test_scandir_and_stat(z_lib_instance, test_structure, mode):
+    root = normalize_path(str(test_structure))
+    archive_path = f"{root}/archive.zip"
+    z_lib_instance.load_zip(archive_path, mode=mode)
+
+    with zipfile.ZipFile(archive_path) as zf:
+        info = zf.getinfo("inner_file.txt")
+
+    with z_lib_instance.os.scandir(archive_path) as it:
+        entries = {entry.name: entry for entry in it}
+    assert set(entries) == {"inner_file.txt", "inner_folder"}
+    assert entries["inner_folder"].is_dir()
+    assert entries["inner_file.txt"].is_file()
+    assert entries["inner_file.txt"].path == f"{archive_path}/inner_file.txt"
+    assert entries["inner_file.txt"].stat().st_size == info.file_size
+
+    st = z_lib_instance.os.stat(f"{archive_path}/inner_file.txt")
+    assert st.st_size == len("inner")
+    # Extracted files carry the member timestamp, so both modes agree
+    assert st.st_mtime == time.mktime(info.date_time + (0, 0, -1))
+    assert z_lib_instance.os.path.getsize(f"{archive_path}/inner_file.txt") == len("inner")
+
+    with pytest.raises(FileNotFoundError):
+        z_lib_instance.os.stat(f"{archive_path}/missing.txt")
+
+    # Loaded ZIPs show up as directories when scanning the local folder
+    local = {entry.name: entry for entry in z_lib_instance.os.scandir(root)}
+    assert local["archive.zip"].is_dir()
+    assert local["normal_file.txt"].is_file()
@@ -1,7 +1,7 @@
 import pytest
 import os
 from pathlib import Path
-from z_lib.path_resolver import normalize_path, split_zip_path, resolve_to_real_path, find_longest_match_handle
+from z_lib.path_resolver import normalize_path, split_zip_path, resolve_to_real_path, find_longest_match_handle, match_many
 from z_lib.exceptions import ZipNotLoadedError
 from z_lib._types import ZipHandle
 
@@ -67,3 +67,22 @@ def test_resolve_normal_path():
     p = resolve_to_real_path("some/local/file.txt", loaded_zips)
     expected = Path("some/local/file.txt").resolve()
     assert p == expected
+
+def test_match_many():
+    loaded_zips = {
+        "a.zip": ZipHandle(path="a.zip", temp_dir="/tmp/uuid_a", mode="r"),
+        "a.zip/b.zip": ZipHandle(path="a.zip/b.zip", temp_dir="/tmp/uuid_b", mode="r"),
+    }
+    paths = ["a.zip/x/1.txt", "a.zip/x/2.txt", "a.zip/b.zip", "a.zip/b.zip/c.txt", "local/file.txt"]
+    results = list(match_many(paths, loaded_zips))
+
+    assert [(p, h and h["temp_dir"], i) for p, h, i in results] == [
+        ("a.zip/x/1.txt", "/tmp/uuid_a", "x/1.txt"),
+        ("a.zip/x/2.txt", "/tmp/uuid_a", "x/2.txt"),
+        ("a.zip/b.zip", "/tmp/uuid_b", ""),
+        ("a.zip/b.zip/c.txt", "/tmp/uuid_b", "c.txt"),
+        ("local/file.txt", None, "local/file.txt"),
+    ]
+    # Same answers as the per-path lookup
+    for path, handle, internal_path in results:
+        assert find_longest_match_handle(path, loaded_zips) == (handle, internal_path if handle else path)
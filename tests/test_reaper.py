@@ -0,0 +1,108 @@
+import pytest
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from z_lib.reaper import Reaper, TRASH_NAME, LOCK_NAME
+
+def _make_tree(path, files=10):
+    path.mkdir()
+    (path / "sub").mkdir()
+    for i in range(files):
+        (path / "sub" / f"{i}.txt").write_text(str(i))
+    return path
+
+def test_discard_is_deferred(tmp_path):
+    reaper = Reaper(root=str(tmp_path), batch=3, pause=0)
+    target = _make_tree(tmp_path / f"z_lib_{os.getpid()}_abc")
+
+    reaper.discard(str(target))
+    # Gone from its original location immediately
+    assert not target.exists()
+
+    assert reaper.wait(timeout=10)
+    assert list((tmp_path / TRASH_NAME).iterdir()) == []
+
+def _crashed_owner_dir(root):
+    """Temp dir made by a process that exited without cleaning up."""
+    code = (
+        "import os, sys\n"
+        "from z_lib.reaper import Reaper\n"
+        "print(Reaper(root=sys.argv[1]).make_temp_dir(), flush=True)\n"
+        "os._exit(0)\n"
+    )
+    env = dict(os.environ, PYTHONPATH=str(Path(__file__).resolve().parent.parent / "src"))
+    out = subprocess.run([sys.executable, "-c", code, str(root)], env=env, capture_output=True, text=True, check=True).stdout
+    data = Path(out.strip())
+    (data / "file.txt").write_text("left behind")
+    return data.parent
+
+def _age(path, seconds):
+    old = time.time() - seconds
+    os.utime(path, (old, old))
+    return path
+
+def test_sweep_removes_only_unlocked_dirs(tmp_path):
+    reaper = Reaper(root=str(tmp_path), pause=0)
+    orphan = _age(_crashed_owner_dir(tmp_path), 120)
+    # Live regardless of age and pid: its owner still holds the lock
+    owner = Reaper(root=str(tmp_path))
+    live = _age(Path(owner.make_temp_dir()).parent, 120)
+    fresh = _crashed_owner_dir(tmp_path)  # may not be locked yet by a live owner
+    lockless_old = _age(_make_tree(tmp_path / "z_lib_1_legacy"), 2 * 24 * 60 * 60)
+    lockless_new = _make_tree(tmp_path / "z_lib_2_legacy")
+    unrelated = _make_tree(tmp_path / "other_dir")
+
+    assert reaper.sweep() == 2
+    assert reaper.wait(timeout=10)
+
+    assert not orphan.exists() and not lockless_old.exists()
+    assert live.exists() and fresh.exists() and lockless_new.exists()
+    assert unrelated.exists()
+    assert list((tmp_path / TRASH_NAME).iterdir()) == []
+
+def test_sweep_async_scans_off_the_calling_thread(tmp_path):
+    reaper = Reaper(root=str(tmp_path), pause=0)
+    orphan = _age(_crashed_owner_dir(tmp_path), 120)
+
+    thread = reaper.sweep_async()
+    assert thread is not None
+    thread.join(timeout=10)
+    assert reaper.wait(timeout=10)
+    assert not orphan.exists()
+
+def test_temp_dirs_live_in_a_per_user_root(tmp_path, monkeypatch):
+    monkeypatch.setattr(tempfile, "tempdir", str(tmp_path))
+    reaper = Reaper()
+    data = Path(reaper.make_temp_dir())
+    assert reaper.root.parent == tmp_path and reaper.root.name.startswith("z_lib-")
+    assert data.parent.parent == reaper.root and (data.parent / LOCK_NAME).exists()
+
+    reaper.discard(str(data))
+    assert not data.parent.exists()
+    assert reaper.wait(timeout=10)
+    assert list(reaper.trash.iterdir()) == []
+
+@pytest.mark.parametrize("unload", ["", "z.unload_zip('many.zip')\n"], ids=["at_exit", "before_exit"])
+def test_exit_removes_this_process_temp_dirs(tmp_path, unload):
+    tmp = tmp_path / "tmp"
+    tmp.mkdir()
+    code = (
+        "import os, zipfile\n"
+        "from z_lib import Z_Lib\n"
+        "with zipfile.ZipFile('many.zip', 'w') as zf:\n"
+        "    for i in range(3000):\n"
+        "        zf.writestr(f'd{i % 10}/{i}.txt', str(i))\n"
+        "z = Z_Lib()\n"
+        "z.load_zip('many.zip', mode='r')\n"
+        f"{unload}"  # deleted by the background thread, or only at exit
+        "print('pid', os.getpid())\n"
+    )
+    env = dict(os.environ, PYTHONPATH=str(Path(__file__).resolve().parent.parent / "src"), TMPDIR=str(tmp))
+    out = subprocess.run([sys.executable, "-c", code], cwd=tmp_path, env=env, capture_output=True, text=True, check=True).stdout
+    pid = next(line.split()[1] for line in out.splitlines() if line.startswith("pid "))
+
+    left = [p for p in tmp.rglob("*") if f"z_lib_{pid}_" in str(p)]
+    assert left == []
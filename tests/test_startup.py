@@ -0,0 +1,34 @@
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+SRC = Path(__file__).resolve().parent.parent / "src"
+
+def _run(code):
+    env = dict(os.environ, PYTHONPATH=str(SRC))
+    return subprocess.run([sys.executable, "-c", code], env=env, capture_output=True, text=True, check=True).stdout
+
+def test_import_and_resolve_stay_lightweight():
+    out = _run(
+        "import sys, z_lib\n"
+        "print(sorted(m for m in ('z_lib.core', 'zipfile', 'shutil', 'tempfile') if m in sys.modules))\n"
+        "z = z_lib.Z_Lib(); z.resolve('local/file.txt')\n"
+        "heavy = ('zipfile', 'tempfile', 'concurrent.futures', 'z_lib.backend.zipfile_backend', 'z_lib.namespaces.z_os')\n"
+        "print(sorted(m for m in heavy if m in sys.modules))\n"
+    )
+    assert out.splitlines() == ["[]", "[]"]
+
+def test_single_atexit_hook_for_all_instances():
+    out = _run(
+        "import atexit, gc\n"
+        "calls = []\n"
+        "atexit.register = lambda fn, *a, **k: calls.append(fn)\n"
+        "from z_lib import Z_Lib\n"
+        "import z_lib.core as core\n"
+        "zs = [Z_Lib() for _ in range(5)]\n"
+        "print(len(calls), len(core._instances))\n"
+        "del zs; gc.collect()\n"
+        "print(len(core._instances))\n"
+    )
+    assert out.splitlines() == ["1 5", "0"]
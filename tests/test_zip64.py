@@ -0,0 +1,64 @@
+import pytest
+import struct
+import zipfile
+from z_lib.core import Z_Lib
+from z_lib.backend.zip_index import ZipIndex
+
+# Zip64 のしきい値を小さくして、4GB / 65,535 エントリ超えと同じレコードを小さなファイルで生成する
+ZIP64_LIMIT = 1000
+FILECOUNT_LIMIT = 5
+
+@pytest.fixture
+def small_zip64_limits(monkeypatch):
+    monkeypatch.setattr(zipfile, "ZIP64_LIMIT", ZIP64_LIMIT)
+    monkeypatch.setattr(zipfile, "ZIP_FILECOUNT_LIMIT", FILECOUNT_LIMIT)
+
+@pytest.fixture
+def zip64_archive(tmp_path, small_zip64_limits):
+    zip_path = tmp_path / "big.zip"
+    with zipfile.ZipFile(zip_path, "w", zipfile.ZIP_DEFLATED) as zf:
+        for i in range(8):
+            with zf.open(f"part/{i}.bin", "w", force_zip64=True) as f:
+                f.write(bytes(range(256)) * (20 + i))
+    return zip_path
+
+def _has_zip64_extra(info):
+    extra = info.extra
+    while len(extra) >= 4:
+        tag, size = struct.unpack("<HH", extra[:4])
+        if tag == 0x0001:
+            return True
+        extra = extra[4 + size:]
+    return False
+
+def test_index_reads_zip64_records(zip64_archive):
+    data = zip64_archive.read_bytes()
+    assert b"PK\x06\x06" in data and b"PK\x06\x07" in data  # Zip64 EOCD + locator
+
+    index = ZipIndex.build(zip64_archive)
+    with zipfile.ZipFile(zip64_archive) as zf:
+        infos = zf.infolist()
+    assert len(index.names) == 8 > FILECOUNT_LIMIT
+    for i, info in enumerate(infos):
+        assert index.file_sizes[i] == info.file_size > ZIP64_LIMIT
+        assert index.compress_sizes[i] == info.compress_size
+        assert index.header_offsets[i] == info.header_offset
+
+@pytest.mark.parametrize("chunk_size", [None, 7])
+def test_zip64_mount_read_and_save(zip64_archive, chunk_size):
+    z = Z_Lib(chunk_size=chunk_size)
+    try:
+        z.load_zip(str(zip64_archive))
+        with z.open(f"{zip64_archive}/part/3.bin", "rb") as f:
+            assert f.read() == bytes(range(256)) * 23
+        with z.open(f"{zip64_archive}/part/new.bin", "wb") as f:
+            f.write(b"\xff" * (ZIP64_LIMIT * 3))
+        z.unload_zip(str(zip64_archive))
+
+        with zipfile.ZipFile(zip64_archive) as zf:
+            assert len(zf.infolist()) == 9
+            assert zf.read("part/new.bin") == b"\xff" * (ZIP64_LIMIT * 3)
+            assert all(_has_zip64_extra(info) for info in zf.infolist())
+        assert z.verify(str(zip64_archive))["bad"] == {}
+    finally:
+        z._cleanup()
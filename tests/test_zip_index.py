@@ -0,0 +1,203 @@
+import pytest
+import os
+import zipfile
+from pathlib import Path
+from z_lib.backend import zip_index
+from z_lib.backend.zip_index import ZipIndex, load_index, index_path_for, prune_cache, SIDECAR
+from z_lib.backend.zipfile_backend import ZipFileBackend
+
+@pytest.fixture
+def sample_zip(tmp_path):
+    zip_path = tmp_path / "test.zip"
+    with zipfile.ZipFile(zip_path, "w", compression=zipfile.ZIP_DEFLATED) as zf:
+        zf.writestr("file1.txt", "content1")
+        zf.writestr("folder/", "")
+        zf.writestr("folder/file2.txt", "content2" * 100)
+    return zip_path
+
+def test_build_matches_zipfile(sample_zip):
+    index = ZipIndex.build(sample_zip)
+    with zipfile.ZipFile(sample_zip) as zf:
+        infos = zf.infolist()
+
+    assert index.names == [info.filename for info in infos]
+    for i, info in enumerate(infos):
+        assert index.header_offsets[i] == info.header_offset
+        assert index.compress_sizes[i] == info.compress_size
+        assert index.file_sizes[i] == info.file_size
+        assert index.crcs[i] == info.CRC
+        assert index.date_time(i) == info.date_time
+
+    assert index.find("folder/file2.txt") == 2
+    assert index.find("folder") == 1
+    assert index.is_dir(1)
+    assert index.find("missing.txt") == -1
+
+def test_open_member(sample_zip):
+    index = ZipIndex.build(sample_zip)
+    with open(sample_zip, "rb") as fp:
+        with index.open_member(fp, index.find("folder/file2.txt")) as f:
+            assert f.read() == b"content2" * 100
+
+def test_cp932_names_decoded(tmp_path):
+    zip_path = tmp_path / "sjis.zip"
+    raw_name = "テスト.txt".encode("cp932")
+    placeholder = b"x" * len(raw_name)
+    with zipfile.ZipFile(zip_path, "w") as zf:
+        zf.writestr(placeholder.decode("ascii"), "sjis")
+    # Simulate a Windows-made archive: CP932 bytes without the UTF-8 flag
+    zip_path.write_bytes(zip_path.read_bytes().replace(placeholder, raw_name))
+
+    index = ZipIndex.build(zip_path)
+    assert index.names == ["テスト.txt"]
+
+def test_save_and_load_roundtrip(sample_zip, tmp_path):
+    index = ZipIndex.build(sample_zip)
+    index_path = tmp_path / "cache" / "test.zidx"
+    index.save(index_path)
+
+    loaded = ZipIndex.load(index_path)
+    assert loaded.names == index.names
+    assert loaded.header_offsets == index.header_offsets
+    assert loaded.crcs == index.crcs
+    assert loaded.matches(sample_zip)
+
+def test_load_index_uses_and_invalidates_cache(sample_zip, monkeypatch):
+    load_index(sample_zip, SIDECAR)
+    index_path = index_path_for(sample_zip, SIDECAR)
+    assert index_path == sample_zip.with_name("test.zip.zidx")
+    assert index_path.exists()
+
+    # A valid cache must be reused without parsing the central directory
+    def fail_build(cls, path):
+        raise AssertionError("central directory parsed despite valid cache")
+    monkeypatch.setattr(ZipIndex, "build", classmethod(fail_build))
+    assert load_index(sample_zip, SIDECAR).names[0] == "file1.txt"
+    monkeypatch.undo()
+
+    # Rewriting the archive changes size/mtime and invalidates the cache
+    with zipfile.ZipFile(sample_zip, "w") as zf:
+        zf.writestr("other.txt", "other")
+    assert load_index(sample_zip, SIDECAR).names == ["other.txt"]
+
+def test_shared_cache_is_pruned_on_write(tmp_path, monkeypatch):
+    cache_dir = tmp_path / "cache"
+    zips = []
+    for name in ("gone", "rewritten", "kept", "new"):
+        zip_path = tmp_path / f"{name}.zip"
+        with zipfile.ZipFile(zip_path, "w") as zf:
+            zf.writestr("f.txt", name)
+        zips.append(zip_path)
+    gone, rewritten, kept, new = zips
+    for zip_path in (gone, rewritten, kept):
+        load_index(zip_path, str(cache_dir))
+
+    gone.unlink()
+    with zipfile.ZipFile(rewritten, "w") as zf:
+        zf.writestr("f.txt", "rewritten with other content")
+    (cache_dir / f"{'0' * 40}{zip_index.INDEX_SUFFIX}").write_bytes(b"ZLIX\x01\x00")  # older format
+    crashed_tmp = cache_dir / f"{'1' * 40}{zip_index.INDEX_SUFFIX}.12345.tmp"
+    crashed_tmp.write_bytes(b"partial")
+    # The cache dir may be shared: files this module did not name are never touched
+    foreign = [cache_dir / "report.tmp", cache_dir / "notes.zidx", cache_dir / f"{'2' * 40}.tmp"]
+    for path in foreign:
+        path.write_bytes(b"keep me")
+    for path in [crashed_tmp] + foreign:
+        os.utime(path, (1, 1))
+
+    monkeypatch.setattr(zip_index, "_last_prune", {})
+    load_index(new, str(cache_dir))
+    expected = {index_path_for(kept, str(cache_dir)), index_path_for(new, str(cache_dir))}
+    assert set(cache_dir.iterdir()) == expected | set(foreign)
+    for path in foreign:
+        path.unlink()
+
+    # Over the entry cap, the least recently written go first
+    os.utime(index_path_for(kept, str(cache_dir)), (1, 1))
+    assert prune_cache(cache_dir, max_entries=1) == 1
+    assert list(cache_dir.iterdir()) == [index_path_for(new, str(cache_dir))]
+
+def test_backend_mount_uses_index(sample_zip):
+    backend = ZipFileBackend(index_cache=False)
+    handle = backend.open(str(sample_zip), create=False, mode="r")
+
+    assert handle["index"].names[0] == "file1.txt"
+    assert (Path(handle["temp_dir"]) / "folder/file2.txt").read_bytes() == b"content2" * 100
+
+    backend.close(handle, save=False)
+
+def _legacy_zip(zip_path, names, encoding):
+    """Write a ZIP whose entry names are raw `encoding` bytes without the UTF-8 flag."""
+    raw_names = [name.encode(encoding) for name in names]
+    placeholders = [chr(ord("A") + i).encode("ascii") * len(raw) for i, raw in enumerate(raw_names)]
+    with zipfile.ZipFile(zip_path, "w") as zf:
+        for placeholder in placeholders:
+            zf.writestr(placeholder.decode("ascii"), "data")
+    data = zip_path.read_bytes()
+    for placeholder, raw in zip(placeholders, raw_names):
+        data = data.replace(placeholder, raw)
+    zip_path.write_bytes(data)
+
+@pytest.mark.parametrize("encoding, names", [
+    ("cp932", ["テスト.txt", "資料/報告書.txt", "ｱｲｳ.txt"]),
+    ("gbk", ["中文文件.txt", "数据/报告.txt"]),
+    ("euc-kr", ["한글파일.txt", "자료/보고서.txt"]),
+])
+def test_detect_encoding(tmp_path, encoding, names):
+    zip_path = tmp_path / "legacy.zip"
+    _legacy_zip(zip_path, names, encoding)
+
+    index = ZipIndex.build(zip_path)
+    assert index.encoding == encoding
+    assert index.names == names
+
+def test_forced_encoding_does_not_leak_into_auto_detect(z_lib_instance, tmp_path, monkeypatch):
+    monkeypatch.setenv("Z_LIB_CACHE_DIR", str(tmp_path / "cache"))
+    zip_path = tmp_path / "sjis.zip"
+    _legacy_zip(zip_path, ["資料.txt"], "cp932")
+
+    with z_lib_instance.load_zip(str(zip_path), mode="r", encoding="gbk"):
+        assert z_lib_instance.os.listdir(str(zip_path)) == ["資料.txt".encode("cp932").decode("gbk")]
+    with z_lib_instance.load_zip(str(zip_path), mode="r"):
+        assert z_lib_instance.os.listdir(str(zip_path)) == ["資料.txt"]
+
+def test_encoding_override_and_roundtrip(tmp_path):
+    zip_path = tmp_path / "legacy.zip"
+    _legacy_zip(zip_path, ["数据.txt"], "gbk")
+
+    # Forcing an encoding replaces detection (and a cached index built without it)
+    load_index(zip_path, SIDECAR)
+    assert load_index(zip_path, SIDECAR, encoding="cp932").names == ["数据.txt".encode("gbk").decode("cp932")]
+    # ... and a cached forced-encoding index is not served to a later auto-detect load
+    assert load_index(zip_path, SIDECAR).names == ["数据.txt"]
+
+    backend = ZipFileBackend(index_cache=False)
+    handle = backend.open(str(zip_path), create=False, mode="rw")
+    assert handle["encoding"] == "gbk"
+    (Path(handle["temp_dir"]) / "新建.txt").write_text("new", encoding="utf-8")
+    backend.close(handle, save=True)
+
+    # Names are written back in the archive's own code page, without the UTF-8 flag
+    with zipfile.ZipFile(zip_path) as zf:
+        for info in zf.infolist():
+            assert not info.flag_bits & 0x800
+    assert sorted(ZipIndex.build(zip_path).names) == sorted(["数据.txt", "新建.txt"])
+
+def test_legacy_names_fall_back_to_utf8_on_unknown_python(tmp_path, monkeypatch):
+    from z_lib.backend import zipfile_backend
+    # 内部実装を確認していない Python バージョンでは、private な名前エンコード処理を上書きしない
+    monkeypatch.setattr(zipfile_backend, "_RAW_COPY_VERSIONS", ((3, 0), (3, 0)))
+    zip_path = tmp_path / "legacy.zip"
+    _legacy_zip(zip_path, ["数据.txt"], "gbk")
+
+    backend = ZipFileBackend(index_cache=False)
+    handle = backend.open(str(zip_path), create=False, mode="rw")
+    assert handle["encoding"] == "gbk"
+    (Path(handle["temp_dir"]) / "新建.txt").write_text("new", encoding="utf-8")
+    backend.close(handle, save=True)
+
+    with zipfile.ZipFile(zip_path) as zf:
+        for info in zf.infolist():
+            assert info.flag_bits & 0x800
+        assert sorted(zf.namelist()) == sorted(["数据.txt", "新建.txt"])
+    assert sorted(ZipIndex.build(zip_path).names) == sorted(["数据.txt", "新建.txt"])